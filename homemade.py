@@ -3,12 +3,19 @@ Some example classes for people who want to create a homemade bot.
 
 With these classes, bot makers will not have to implement the UCI or XBoard interfaces themselves.
 """
+from __future__ import annotations
 import chess
+import chess.polyglot
 
 from chess.engine import PlayResult, Limit
 
+import heapq
 import random
 import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from typing import Any, cast
 from lib.engine_wrapper import MinimalEngine
 from lib.lichess_types import MOVE, HOMEMADE_ARGS_TYPE
 import logging
@@ -19,6 +26,891 @@ import logging
 # logger.debug("message") will only print "message" if verbose logging is enabled.
 logger = logging.getLogger(__name__)
 
+# --- Piece-Square Tables (positional bonuses) ---
+# Tables are from White's perspective (higher values = better for White)
+# Black's pieces use the same table flipped vertically
+# VALUES SCALED DOWN: Piece-square tables are now SUBTLE hints (2-5 points max)
+# This prevents sacrificing pieces just to reach "good" squares
+
+PAWN_TABLE = (
+    0,  0,  0,  0,  0,  0,  0,  0,
+    5,  5,  5,  5,  5,  5,  5,  5,
+    1,  1,  2,  3,  3,  2,  1,  1,
+    0,  0,  1,  2,  2,  1,  0,  0,
+    0,  0,  0,  2,  2,  0,  0,  0,
+    0, -1, -1,  0,  0, -1, -1,  0,
+    0,  1,  1, -2, -2,  1,  1,  0,
+    0,  0,  0,  0,  0,  0,  0,  0
+)
+
+KNIGHT_TABLE = (
+    -5, -4, -3, -3, -3, -3, -4, -5,
+    -4, -2,  0,  0,  0,  0, -2, -4,
+    -3,  0,  1,  2,  2,  1,  0, -3,
+    -3,  0,  2,  3,  3,  2,  0, -3,
+    -3,  0,  2,  3,  3,  2,  0, -3,
+    -3,  0,  1,  2,  2,  1,  0, -3,
+    -4, -2,  0,  0,  0,  0, -2, -4,
+    -5, -4, -3, -3, -3, -3, -4, -5
+)
+
+BISHOP_TABLE = (
+    -2, -1, -1, -1, -1, -1, -1, -2,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -1,  0,  1,  1,  1,  1,  0, -1,
+    -1,  0,  1,  2,  2,  1,  0, -1,
+    -1,  0,  1,  2,  2,  1,  0, -1,
+    -1,  0,  1,  1,  1,  1,  0, -1,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -2, -1, -1, -1, -1, -1, -1, -2
+)
+
+ROOK_TABLE = (
+    0,  0,  0,  0,  0,  0,  0,  0,
+    1,  2,  2,  2,  2,  2,  2,  1,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    0,  0,  0,  1,  1,  0,  0,  0
+)
+
+QUEEN_TABLE = (
+    -2, -1, -1,  0,  0, -1, -1, -2,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -1,  0,  1,  1,  1,  1,  0, -1,
+    -1,  0,  1,  1,  1,  1,  0, -1,
+    -1,  0,  1,  1,  1,  1,  0, -1,
+    -1,  0,  1,  1,  1,  1,  0, -1,
+    -1,  0,  0,  0,  0,  0,  0, -1,
+    -2, -1, -1,  0,  0, -1, -1, -2
+)
+
+KING_MIDDLEGAME_TABLE = (
+    -3, -4, -4, -5, -5, -4, -4, -3,
+    -3, -4, -4, -5, -5, -4, -4, -3,
+    -3, -4, -4, -5, -5, -4, -4, -3,
+    -3, -4, -4, -5, -5, -4, -4, -3,
+    -2, -3, -3, -4, -4, -3, -3, -2,
+    -1, -2, -2, -2, -2, -2, -2, -1,
+    2,  2,  0,  0,  0,  0,  2,  2,
+    2,  3,  1,  0,  0,  1,  3,  2
+)
+
+KING_ENDGAME_TABLE = (
+    -5, -4, -3, -2, -2, -3, -4, -5,
+    -3, -2, -1,  0,  0, -1, -2, -3,
+    -3, -1,  2,  3,  3,  2, -1, -3,
+    -3, -1,  3,  4,  4,  3, -1, -3,
+    -3, -1,  3,  4,  4,  3, -1, -3,
+    -3, -1,  2,  3,  3,  2, -1, -3,
+    -3, -3,  0,  0,  0,  0, -3, -3,
+    -5, -3, -3, -3, -3, -3, -3, -5
+)
+
+# Piece values indexed by piece type (index 0 is unused, king material is ignored)
+PIECE_VALUES = (0, 100, 320, 330, 500, 900, 0)
+
+
+def signed_pst(table: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    Build a 128-entry table indexed by color * 64 + square, scored from White's perspective.
+
+    Black's half is the White table flipped vertically (square ^ 56) and negated, so both colors just add.
+    """
+    return tuple(-table[square ^ 56] for square in range(64)) + table
+
+
+def pst_slice_sums(table: tuple[int, ...]) -> tuple[array[int], array[int], array[int], array[int]]:
+    """
+    Pre-sum a 64-entry square-value table for every pattern of pieces on each 16-square quarter of the board.
+
+    The score of a bitboard `bb` is then four lookups, one per 16-bit slice of `bb`.
+    """
+    slices = []
+    for offset in (0, 16, 32, 48):
+        sums = [0]
+        for square in range(offset, offset + 16):
+            value = table[square]
+            sums += [total + value for total in sums]  # Patterns with this square set extend those without it
+        slices.append(array("h", sums))
+    return slices[0], slices[1], slices[2], slices[3]
+
+
+def color_slice_sums(table: tuple[int, ...],
+                     piece_value: int) -> tuple[tuple[array[int], array[int], array[int], array[int]], ...]:
+    """Slice sums of a piece's material value plus its PST for each color, indexed by chess.BLACK / chess.WHITE."""
+    flat = signed_pst(tuple(piece_value + bonus for bonus in table))
+    return pst_slice_sums(flat[:64]), pst_slice_sums(flat[64:])
+
+
+# Slice sums indexed by [piece_type - 1][color] (the king entry is the middlegame table)
+PST_SLICE_SUMS = tuple(color_slice_sums(table, PIECE_VALUES[piece_type]) for piece_type, table in enumerate(
+    (PAWN_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_MIDDLEGAME_TABLE), start=1))
+KING_ENDGAME_SLICE_SUMS = color_slice_sums(KING_ENDGAME_TABLE, PIECE_VALUES[chess.KING])
+
+# Squares within two king steps (Chebyshev distance <= 2) of each square, as bitboards
+KING_ZONE = tuple(
+    sum(chess.BB_SQUARES[square] for square in chess.SQUARES if chess.square_distance(king_square, square) <= 2)
+    for king_square in chess.SQUARES
+)
+
+# Piece types checked for hanging pieces, most valuable first (the king cannot hang)
+HANGING_PIECE_TYPES = (chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT, chess.PAWN)
+
+# Squares rewarded for control in the middlegame
+CENTER_SQUARES = (chess.E4, chess.D4, chess.E5, chess.D5)
+
+# Transposition table bound flags: the stored score is exact, a lower bound (fail high) or an upper bound (fail low)
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+# Number of slots in MyBot's transposition table (a power of two, so a slot is the low bits of the hash)
+TT_SIZE = 1 << 20
+TT_INDEX_MASK = TT_SIZE - 1
+
+# Maximum number of static evaluations cached during one search
+EVAL_CACHE_MAX_ENTRIES = 100_000
+
+# Number of quiet moves order_moves sorts to the front; the rest keep generation order
+QUIET_MOVES_SORTED = 6
+
+# Quiescence plies (counted from the horizon) that also search quiet checking moves; deeper ones only capture
+QS_CHECK_PLIES = 2
+
+# Time management: without a moves-to-go count, the game is expected to last EXPECTED_GAME_MOVES moves
+# but always at least MIN_MOVES_LEFT more; INCREMENT_SHARE of the increment is spent on every move
+EXPECTED_GAME_MOVES = 60
+MIN_MOVES_LEFT = 20
+INCREMENT_SHARE = 0.8
+# Share of the budget held back when all of it is for one move, so the move is sent in time
+MOVE_TIME_MARGIN = 0.1
+
+# Deepest ply tracked by per-ply search tables such as killer moves
+MAX_PLY = 64
+
+# Aspiration windows: half-width of the first root window around the previous iteration's score,
+# and how much a side that fails is widened before it is opened fully
+ASPIRATION_WINDOW = 50
+ASPIRATION_WIDEN = 200
+
+# The search polls the clock once every TIME_CHECK_MASK + 1 nodes
+TIME_CHECK_MASK = 1023
+
+# Null-move pruning: minimum remaining depth to try a null move, and how much shallower its search is
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+
+# Late move reductions: quiet moves from this index on are first searched a ply shallower, at this depth or more
+LMR_MIN_MOVE_INDEX = 3
+LMR_MIN_DEPTH = 3
+
+# Late move pruning: one ply from the horizon, quiet moves from this index on are not searched at all
+LMP_MIN_MOVE_INDEX = 6
+
+# Ordering bonus for killer moves: below any good capture, above ordinary quiet moves
+KILLER_SCORE = 800
+
+# History scores stay below this so killers still sort first: the whole table is halved when an entry reaches it
+HISTORY_LIMIT = 700
+
+
+def evaluate_material_pst(pieces_by_type: tuple[int, int, int, int, int, int], white: int, black: int,
+                          is_endgame: bool) -> int:
+    """
+    Score material and piece-square bonuses from White's perspective.
+
+    Only plain ints and tuples go in, so the board has to be split into its bitboards by the caller:
+    `pieces_by_type` holds the pawn, knight, bishop, rook, queen and king bitboards, in that order.
+    Material is folded into the slice sums, so each piece type costs eight table lookups and no popcounts.
+    """
+    score = 0
+    for piece_type, pieces in enumerate(pieces_by_type, start=1):
+        white_pieces = pieces & white
+        black_pieces = pieces & black
+
+        # Select appropriate king table
+        if piece_type == chess.KING and is_endgame:
+            black_sums, white_sums = KING_ENDGAME_SLICE_SUMS
+        else:
+            black_sums, white_sums = PST_SLICE_SUMS[piece_type - 1]
+
+        # Black's sums are already flipped and negated, so both colors add
+        sums0, sums1, sums2, sums3 = white_sums
+        score += (sums0[white_pieces & 0xFFFF] + sums1[(white_pieces >> 16) & 0xFFFF] +
+                  sums2[(white_pieces >> 32) & 0xFFFF] + sums3[white_pieces >> 48])
+        sums0, sums1, sums2, sums3 = black_sums
+        score += (sums0[black_pieces & 0xFFFF] + sums1[(black_pieces >> 16) & 0xFFFF] +
+                  sums2[(black_pieces >> 32) & 0xFFFF] + sums3[black_pieces >> 48])
+    return score
+
+
+def pawn_attacks(pawns: int, color: chess.Color) -> int:
+    """Squares attacked by the given pawns of `color`, by shifting the whole bitboard at once."""
+    if color == chess.WHITE:
+        return ((pawns << 9) & ~chess.BB_FILE_A | (pawns << 7) & ~chess.BB_FILE_H) & chess.BB_ALL
+    return (pawns >> 7) & ~chess.BB_FILE_A | (pawns >> 9) & ~chess.BB_FILE_H
+
+
+def hanging_penalty(board: chess.Board, color: chess.Color, enemy_attacks: int) -> int:
+    """
+    Penalty for pieces of `color` that are under-defended, or attacked by something cheaper than themselves.
+
+    `enemy_attacks` is the opponent's attack map: pieces outside of it are not looked at.
+    """
+    enemy = not color
+    enemy_pawn_attacks = pawn_attacks(board.pawns & board.occupied_co[enemy], enemy)
+    penalty = 0
+    for piece_type in HANGING_PIECE_TYPES:
+        piece_value = PIECE_VALUES[piece_type]
+        for square in chess.scan_forward(board.pieces_mask(piece_type, color) & enemy_attacks):
+            attackers = board.attackers_mask(enemy, square)
+            defenders = board.attackers_mask(color, square).bit_count()
+
+            # Simple check: if more attackers than defenders, piece is hanging
+            if attackers.bit_count() > defenders:
+                penalty += piece_value * 7 // 10
+            elif defenders > 0:
+                # Check if lowest attacker is cheaper than our piece. The king (no material value) and
+                # pawns come first, and without them no attacker is cheap enough to matter for minor pieces
+                if attackers & board.kings:
+                    min_attacker_value = PIECE_VALUES[chess.KING]
+                elif enemy_pawn_attacks & chess.BB_SQUARES[square]:
+                    min_attacker_value = PIECE_VALUES[chess.PAWN]
+                elif piece_value > PIECE_VALUES[chess.KNIGHT] + 150:
+                    min_attacker_value = min(PIECE_VALUES[board.piece_type_at(sq) or 0]
+                                             for sq in chess.scan_forward(attackers))
+                else:
+                    continue
+                if piece_value > min_attacker_value + 150:
+                    # Bad trade possible (e.g., Queen vs Bishop)
+                    penalty += (piece_value - min_attacker_value) * 2 // 5
+    return penalty
+
+
+# MVV-LVA capture scores indexed by (victim_type << 3) | attacker_type: most valuable victim first,
+# least valuable attacker breaking ties
+MVV_LVA = tuple(PIECE_VALUES[victim] * 10 - PIECE_VALUES[attacker] if 1 <= victim <= 6 and 1 <= attacker <= 6 else 0
+                for victim in range(8) for attacker in range(8))
+
+# Score for delivering checkmate; mates found sooner score higher by one per ply
+MATE_SCORE = 10_000_000
+
+
+def terminal_score(board: chess.Board, ply: int = 0) -> int:
+    """Score a position with no legal moves for the side to move: checkmated (sooner is worse) or stalemated."""
+    return -(MATE_SCORE - ply) if board.is_check() else 0
+
+
+# Piece values for exchange evaluation: the king is priced so that it never recaptures into an attack
+SEE_VALUES = (0, 100, 320, 330, 500, 900, 20_000)
+
+
+def see_gain(board: chess.Board, move: chess.Move) -> int:
+    """
+    Compute the material `move` wins once both sides trade off on its destination square (static exchange evaluation).
+
+    Each side recaptures with its cheapest attacker and may stop whenever that is better, all on bitboards
+    without pushing any moves.
+    """
+    to_square = move.to_square
+    occupied = board.occupied ^ chess.BB_SQUARES[move.from_square]
+    if board.is_en_passant(move):
+        occupied ^= chess.BB_SQUARES[to_square ^ 8]  # The captured pawn is behind the destination square
+        captured_type: int | None = chess.PAWN
+    else:
+        captured_type = board.piece_type_at(to_square)
+
+    gains = [SEE_VALUES[captured_type or 0]]
+    if move.promotion:
+        gains[0] += SEE_VALUES[move.promotion] - SEE_VALUES[chess.PAWN]
+        on_square_value = SEE_VALUES[move.promotion]
+    else:
+        on_square_value = SEE_VALUES[board.piece_type_at(move.from_square) or 0]
+
+    color = not board.turn
+    while True:
+        attackers = board.attackers_mask(color, to_square, occupied) & occupied
+        if not attackers:
+            break
+        for piece_type, pieces in enumerate((board.pawns, board.knights, board.bishops,
+                                             board.rooks, board.queens, board.kings), start=1):
+            if attackers & pieces:
+                attacker_type = piece_type
+                attacker = attackers & pieces
+                break
+        gains.append(on_square_value - gains[-1])
+        on_square_value = SEE_VALUES[attacker_type]
+        occupied ^= attacker & -attacker  # Remove the attacker so pieces behind it (x-rays) join in
+        color = not color
+
+    # Walk back: each side only recaptures if it doesn't lose material by doing so
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+    return gains[0]
+
+
+def move_gives_check(board: chess.Board, move: chess.Move) -> bool:
+    """
+    Check whether `move` checks the opponent, like `board.gives_check(move)` but without pushing the move.
+
+    Looks for a direct check by the moved (or promoted) piece and a discovered check by one of our sliders.
+    """
+    king = board.king(not board.turn)
+    if king is None:
+        return False
+    if board.is_castling(move):
+        return board.gives_check(move)  # Rare, and the rook moves as well
+
+    from_square = move.from_square
+    to_square = move.to_square
+    occupied = (board.occupied ^ chess.BB_SQUARES[from_square]) | chess.BB_SQUARES[to_square]
+    if board.is_en_passant(move):
+        occupied ^= chess.BB_SQUARES[to_square ^ 8]
+
+    # Direct check from the destination square
+    piece_type = move.promotion or board.piece_type_at(from_square)
+    if piece_type == chess.PAWN:
+        attacks = chess.BB_PAWN_ATTACKS[board.turn][to_square]
+    elif piece_type == chess.KNIGHT:
+        attacks = chess.BB_KNIGHT_ATTACKS[to_square]
+    elif piece_type == chess.KING:
+        attacks = 0
+    else:
+        attacks = 0
+        if piece_type != chess.ROOK:
+            attacks |= chess.BB_DIAG_ATTACKS[to_square][chess.BB_DIAG_MASKS[to_square] & occupied]
+        if piece_type != chess.BISHOP:
+            attacks |= (chess.BB_RANK_ATTACKS[to_square][chess.BB_RANK_MASKS[to_square] & occupied] |
+                        chess.BB_FILE_ATTACKS[to_square][chess.BB_FILE_MASKS[to_square] & occupied])
+    if attacks & chess.BB_SQUARES[king]:
+        return True
+
+    # Discovered check: one of our other sliders now sees the king
+    sliders = board.occupied_co[board.turn] & ~chess.BB_SQUARES[from_square]
+    diagonal = chess.BB_DIAG_ATTACKS[king][chess.BB_DIAG_MASKS[king] & occupied] & (board.queens | board.bishops)
+    straight = (chess.BB_RANK_ATTACKS[king][chess.BB_RANK_MASKS[king] & occupied] |
+                chess.BB_FILE_ATTACKS[king][chess.BB_FILE_MASKS[king] & occupied]) & (board.queens | board.rooks)
+    return bool((diagonal | straight) & sliders)
+
+
+def generate_quiet_moves(board: chess.Board) -> Iterator[chess.Move]:
+    """Generate the legal moves that capture nothing: together with `board.generate_legal_captures()`, every legal move."""
+    # Castling is generated as the king moving onto its own rook, so those squares are targets too
+    targets = (~board.occupied | (board.rooks & board.occupied_co[board.turn])) & chess.BB_ALL
+    moves = board.generate_legal_moves(chess.BB_ALL, targets)
+    ep_square = board.ep_square
+    if ep_square is None:
+        return moves
+    # Only an en passant capture takes a pawn onto the en passant square
+    pawns = board.pawns
+    return (move for move in moves if move.to_square != ep_square or not pawns & chess.BB_SQUARES[move.from_square])
+
+
+def verified_checks(board: chess.Board, piece_type: chess.PieceType, movers: int,
+                    to_mask: int) -> Iterator[tuple[chess.PieceType, chess.Move]]:
+    """Generate the moves of `movers` onto `to_mask` that give check, testing each with `move_gives_check`."""
+    if movers:
+        for move in board.generate_legal_moves(movers, to_mask):
+            if move_gives_check(board, move):
+                yield piece_type, move
+
+
+def direct_checks(board: chess.Board, piece_type: chess.PieceType, movers: int,
+                  check_squares: int) -> Iterator[tuple[chess.PieceType, chess.Move]]:
+    """Generate the moves of `movers` onto `check_squares`, the squares from which a `piece_type` attacks the king."""
+    if movers and check_squares:
+        for move in board.generate_legal_moves(movers, check_squares):
+            yield piece_type, move
+
+
+def pawn_checks(board: chess.Board, king: chess.Square, pawns: int,
+                to_mask: int) -> Iterator[tuple[chess.PieceType, chess.Move]]:
+    """Generate quiet pawn checks: pushes next to the king, and promotions whose new piece checks (verified)."""
+    promoting = pawns & (chess.BB_RANK_7 if board.turn else chess.BB_RANK_2)
+    yield from direct_checks(board, chess.PAWN, pawns & ~promoting, chess.BB_PAWN_ATTACKS[not board.turn][king] & to_mask)
+    yield from verified_checks(board, chess.PAWN, promoting, to_mask)
+
+
+def knight_checks(board: chess.Board, king: chess.Square, knights: int,
+                  to_mask: int) -> Iterator[tuple[chess.PieceType, chess.Move]]:
+    """Generate quiet knight checks: jumps onto the squares a knight's move away from the king."""
+    yield from direct_checks(board, chess.KNIGHT, knights, chess.BB_KNIGHT_ATTACKS[king] & to_mask)
+
+
+def slider_checks(board: chess.Board, king: chess.Square, movers: int,
+                  to_mask: int) -> Iterator[tuple[chess.PieceType, chess.Move]]:
+    """Generate quiet bishop, rook and queen checks: moves onto the open lines from the king they attack along."""
+    occupied = board.occupied
+    diagonal = chess.BB_DIAG_ATTACKS[king][chess.BB_DIAG_MASKS[king] & occupied] & to_mask
+    straight = (chess.BB_RANK_ATTACKS[king][chess.BB_RANK_MASKS[king] & occupied] |
+                chess.BB_FILE_ATTACKS[king][chess.BB_FILE_MASKS[king] & occupied]) & to_mask
+    yield from direct_checks(board, chess.BISHOP, board.bishops & movers, diagonal)
+    yield from direct_checks(board, chess.ROOK, board.rooks & movers, straight)
+    yield from direct_checks(board, chess.QUEEN, board.queens & movers, diagonal | straight)
+
+
+def discovered_check_blockers(board: chess.Board, king: chess.Square) -> int:
+    """Find the pieces of the side to move that stand alone between `king` and one of their own sliders."""
+    us = board.occupied_co[board.turn]
+    snipers = ((chess.BB_DIAG_ATTACKS[king][0] & (board.bishops | board.queens)) |
+               ((chess.BB_RANK_ATTACKS[king][0] | chess.BB_FILE_ATTACKS[king][0]) & (board.rooks | board.queens)))
+    blockers = 0
+    for sniper in chess.scan_reversed(snipers & us):
+        between = chess.between(king, sniper) & board.occupied
+        if between & us and between & (between - 1) == 0:
+            blockers |= between
+    return blockers
+
+
+def generate_quiet_checks(board: chess.Board) -> Iterator[tuple[chess.PieceType, chess.Move]]:
+    """
+    Generate the quiet moves that give check, each with the type of the piece that moves.
+
+    Each piece type is only generated onto the squares from which it would attack the enemy king, so the piece
+    type comes from the generator and no move has to be looked up or tested. Discovered checks, promotions and
+    castling are rare, and verified one by one with `move_gives_check`.
+    """
+    king = board.king(not board.turn)
+    if king is None:
+        return
+    us = board.occupied_co[board.turn]
+    empty = ~board.occupied & chess.BB_ALL
+    # A pawn reaching the en passant square captures
+    quiet_pawn_targets = empty if board.ep_square is None else empty & ~chess.BB_SQUARES[board.ep_square]
+
+    # Moving a piece off the line between our slider and the king may check, whatever its type: verified instead
+    discoverers = discovered_check_blockers(board, king)
+    movers = us & ~discoverers
+    yield from pawn_checks(board, king, board.pawns & movers, quiet_pawn_targets)
+    yield from knight_checks(board, king, board.knights & movers, empty)
+    yield from slider_checks(board, king, movers, empty)
+    for piece_type in chess.PIECE_TYPES:
+        yield from verified_checks(board, piece_type, board.pieces_mask(piece_type, board.turn) & discoverers,
+                                   quiet_pawn_targets if piece_type == chess.PAWN else empty)
+
+    # Castling is generated as the king moving onto its own rook, which may then give check
+    if board.castling_rights:
+        yield from verified_checks(board, chess.KING, board.kings & us, board.rooks & us)
+
+
+# Polyglot Zobrist keys, shared with chess.polyglot.zobrist_hash so both hashes agree
+ZOBRIST_KEYS = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+ZOBRIST_HASHER = chess.polyglot.ZobristHasher(ZOBRIST_KEYS)
+ZOBRIST_TURN = ZOBRIST_KEYS[780]
+
+
+def zobrist_piece_key(piece_type: chess.PieceType, color: chess.Color, square: chess.Square) -> int:
+    """Zobrist key of one piece on one square."""
+    return ZOBRIST_KEYS[64 * ((piece_type - 1) * 2 + color) + square]
+
+
+class ZobristBoard(chess.Board):
+    """
+    A board that keeps its Polyglot Zobrist hash up to date as moves are pushed and popped.
+
+    `zhash` always equals `chess.polyglot.zobrist_hash(board)`, but a move only costs a few XORs instead of
+    a rehash of the whole board. Positions must be reached through `push`: after `set_fen` and the like,
+    the hash is stale.
+    """
+
+    def __init__(self, fen: str | None = chess.STARTING_FEN, *, chess960: bool = False) -> None:
+        """Set up the board like `chess.Board`, and hash it from scratch."""
+        super().__init__(fen, chess960=chess960)
+        self.zhash = self.full_hash()
+        self._zhash_stack: list[int] = []
+
+    def full_hash(self) -> int:
+        """Hash the position from scratch."""
+        return chess.polyglot.zobrist_hash(self)
+
+    @classmethod
+    def from_board(cls, board: chess.Board) -> ZobristBoard:
+        """
+        Copy `board`, move stack included, by replaying its game from the root position.
+
+        Boards of variants get a `VariantZobristBoard` of their own variant, so the variant's rules still apply.
+        """
+        board_type = cls if type(board) is chess.Board else variant_zobrist_board_type(type(board))
+        zobrist_board = board_type(board.root().fen(), chess960=board.chess960)
+        for move in board.move_stack:
+            zobrist_board.push(move)
+        return zobrist_board
+
+    def copy(self, *, stack: bool | int = True) -> ZobristBoard:
+        """Copy the board along with its hash and the hashes of the copied move stack."""
+        board: ZobristBoard = super().copy(stack=stack)
+        board.zhash = self.zhash
+        board._zhash_stack = self._zhash_stack[len(self._zhash_stack) - len(board.move_stack):]
+        return board
+
+    def is_repeated(self, root_ply: int) -> bool:
+        """
+        Check whether this position repeats since the last capture or pawn move, for the search to score as a draw.
+
+        An earlier occurrence from ply `root_ply` on (inside the search tree) is enough, since the side that repeated
+        it could repeat it again. Before that, in the game already played, it takes a real threefold repetition.
+        Stored hashes are compared instead of replaying the move stack. The hash includes the side to move, so
+        positions with the other side to move never match.
+        """
+        halfmove_clock = self.halfmove_clock
+        # A position can recur four plies later at the earliest, and never across an irreversible move
+        if halfmove_clock < 4:
+            return False
+        zhash_stack = self._zhash_stack
+        start = max(len(zhash_stack) - halfmove_clock, 0)
+        root = max(start, root_ply)
+        return self.zhash in zhash_stack[root:] or zhash_stack[start:root].count(self.zhash) >= 2
+
+    def _pieces_key(self, mask: int) -> int:
+        """XOR of the piece keys of every piece inside `mask`."""
+        key = 0
+        for square in chess.scan_forward(self.occupied & mask):
+            color = bool(self.occupied_co[chess.WHITE] & chess.BB_SQUARES[square])
+            key ^= zobrist_piece_key(self.piece_type_at(square) or 0, color, square)
+        return key
+
+    def _changes_castling(self, move: chess.Move) -> bool:
+        """Check whether `move` can change castling rights: it moves a king, or moves or captures an unmoved rook."""
+        if not move or not self.castling_rights:
+            return False
+        touched = chess.BB_SQUARES[move.from_square] | chess.BB_SQUARES[move.to_square]
+        return bool(touched & (self.castling_rights | self.kings))
+
+    def _castling_rank(self, move: chess.Move) -> int:
+        """Get the back rank that king and rook both move along if `move` castles, else 0."""
+        if move and self.kings & chess.BB_SQUARES[move.from_square] and self.is_castling(move):
+            return chess.BB_RANKS[chess.square_rank(move.from_square)]
+        return 0
+
+    def _state_key(self, *, castling: bool) -> int:
+        """XOR of the en passant key and, if `castling`, the castling rights key: both may change with a move."""
+        key = ZOBRIST_HASHER.hash_castling(self) if castling else 0
+        if self.ep_square is not None:
+            key ^= ZOBRIST_HASHER.hash_ep_square(self)
+        return key
+
+    def _moved_pieces_key(self, move: chess.Move) -> int:
+        """XOR of the piece keys a move (other than castling) removes and adds, promotions and en passant included."""
+        from_square = move.from_square
+        to_square = move.to_square
+        pivot = self.turn
+        piece_type = self.piece_type_at(from_square) or 0
+        key = zobrist_piece_key(piece_type, pivot, from_square) ^ zobrist_piece_key(move.promotion or piece_type, pivot,
+                                                                                    to_square)
+        captured_type = self.piece_type_at(to_square)
+        if captured_type:
+            key ^= zobrist_piece_key(captured_type, not pivot, to_square)
+        elif piece_type == chess.PAWN and to_square == self.ep_square:
+            key ^= zobrist_piece_key(chess.PAWN, not pivot, to_square - 8 if pivot else to_square + 8)
+        return key
+
+    def push(self, move: chess.Move) -> None:
+        """Make a move, updating `zhash` with the pieces, castling rights and en passant square it changes."""
+        zhash = self.zhash
+        self._zhash_stack.append(zhash)
+
+        # Castling rights can only change when a king or a rook on its starting square moves or is captured
+        changes_castling = self._changes_castling(move)
+        castling_rank = self._castling_rank(move)
+        zhash ^= self._state_key(castling=changes_castling)
+        if castling_rank:
+            # King and rook both move along the back rank: rehash the rank before and after
+            zhash ^= self._pieces_key(castling_rank)
+        elif move:
+            zhash ^= self._moved_pieces_key(move)
+
+        super().push(move)
+
+        if castling_rank:
+            zhash ^= self._pieces_key(castling_rank)
+        self.zhash = zhash ^ self._state_key(castling=changes_castling) ^ ZOBRIST_TURN
+
+    def pop(self) -> chess.Move:
+        """Take back the last move, restoring the hash it replaced."""
+        move = super().pop()
+        self.zhash = self._zhash_stack.pop()
+        return move
+
+
+class VariantZobristBoard(ZobristBoard):
+    """
+    A `ZobristBoard` for the variants in `chess.variant`, combined with a variant's board class.
+
+    Drops, explosions and the like change the board in ways the incremental update doesn't follow, so the hash
+    is recomputed after every move, from everything the variant counts for a repetition (pockets included).
+    """
+
+    def full_hash(self) -> int:
+        """Hash the position from scratch, keeping the key non-negative like a Polyglot hash."""
+        return hash(self._transposition_key()) & 0xFFFF_FFFF_FFFF_FFFF
+
+    def push(self, move: chess.Move) -> None:
+        """Make a move by the variant's rules, then rehash the position."""
+        self._zhash_stack.append(self.zhash)
+        super(ZobristBoard, self).push(move)
+        self.zhash = self.full_hash()
+
+
+# The VariantZobristBoard classes made so far, by the variant board class they are combined with
+VARIANT_ZOBRIST_BOARD_TYPES: dict[type[chess.Board], type[VariantZobristBoard]] = {}
+
+
+def variant_zobrist_board_type(board_type: type[chess.Board]) -> type[VariantZobristBoard]:
+    """Get the `VariantZobristBoard` class for boards of `board_type`, such as `chess.variant.CrazyhouseBoard`."""
+    zobrist_board_type = VARIANT_ZOBRIST_BOARD_TYPES.get(board_type)
+    if zobrist_board_type is None:
+        zobrist_board_type = cast(type[VariantZobristBoard],
+                                  type(f"Zobrist{board_type.__name__}", (VariantZobristBoard, board_type), {}))
+        VARIANT_ZOBRIST_BOARD_TYPES[board_type] = zobrist_board_type
+    return zobrist_board_type
+
+
+# --- Enhanced evaluation with piece-square tables ---
+def evaluate_position(b: chess.Board, hanging_cache: dict[tuple[tuple[int, ...], chess.Color], int]) -> int:
+    """Evaluate a position from White's perspective, with hanging-piece penalties memoized in `hanging_cache`."""
+    # Large score for checkmate, zero for stalemate
+    # Only the first legal move is generated; draw claims (repetition, 50 moves) are left to the search
+    if not any(b.generate_legal_moves()):
+        score = terminal_score(b)
+        return score if b.turn == chess.WHITE else -score
+
+    # Determine game phase based on the side with FEWER pieces
+    # This ensures endgame detection works even if one side has more pieces
+    white = b.occupied_co[chess.WHITE]
+    black = b.occupied_co[chess.BLACK]
+    min_pieces = min(white.bit_count(), black.bit_count())
+
+    # Endgame: when the side with fewer pieces has <= 5 pieces (including king)
+    is_endgame = min_pieces <= 5
+
+    # Material + piece-square tables, computed from the raw bitboards
+    pawns = b.pawns
+    score = evaluate_material_pst((pawns, b.knights, b.bishops, b.rooks, b.queens, b.kings),
+                                  white, black, is_endgame)
+
+    # --- Defensive enhancements ---
+    # SIMPLIFIED: Just check if pieces are hanging (undefended or under-defended)
+    # Attack maps for each side, built once: only attacked pieces need the detailed check.
+    # Pawns are shifted as a whole bitboard, other pieces looked up one by one
+    scan_forward = chess.scan_forward
+    attacks_mask = b.attacks_mask
+    white_attacks = pawn_attacks(pawns & white, chess.WHITE)
+    for square in scan_forward(white & ~pawns):
+        white_attacks |= attacks_mask(square)
+    black_attacks = pawn_attacks(pawns & black, chess.BLACK)
+    for square in scan_forward(black & ~pawns):
+        black_attacks |= attacks_mask(square)
+
+    # Hanging pieces only depend on where the pieces stand, so the result is shared across
+    # positions that differ only in side to move, castling rights or en passant
+    placement = (pawns, b.knights, b.bishops, b.rooks, b.queens, b.kings, white)
+    score -= (cached_hanging_penalty(b, chess.WHITE, black_attacks, placement, hanging_cache) -
+              cached_hanging_penalty(b, chess.BLACK, white_attacks, placement, hanging_cache))
+
+    # Check king safety: count attacked squares near each king
+    if not is_endgame:
+        white_king = b.king(chess.WHITE)
+        if white_king is not None:
+            score -= (black_attacks & KING_ZONE[white_king]).bit_count() * 5
+        black_king = b.king(chess.BLACK)
+        if black_king is not None:
+            score += (white_attacks & KING_ZONE[black_king]).bit_count() * 5
+
+    # Bonus for controlling center (only in middlegame)
+    if not is_endgame:
+        for sq in CENTER_SQUARES:
+            white_control = b.attackers_mask(chess.WHITE, sq).bit_count()
+            black_control = b.attackers_mask(chess.BLACK, sq).bit_count()
+            score += (white_control - black_control) * 3
+
+    return score
+
+
+def cached_hanging_penalty(b: chess.Board, color: chess.Color, enemy_attacks: int, placement: tuple[int, ...],
+                           hanging_cache: dict[tuple[tuple[int, ...], chess.Color], int]) -> int:
+    """Memoized `hanging_penalty`, keyed by piece placement and color."""
+    key = (placement, color)
+    penalty = hanging_cache.get(key)
+    if penalty is None:
+        if len(hanging_cache) >= EVAL_CACHE_MAX_ENTRIES:
+            hanging_cache.clear()
+        penalty = hanging_cache[key] = hanging_penalty(b, color, enemy_attacks)
+    return penalty
+
+
+def evaluate(b: ZobristBoard, eval_cache: OrderedDict[int, int],
+             hanging_cache: dict[tuple[tuple[int, ...], chess.Color], int]) -> int:
+    """
+    Evaluate a position from the side to move's perspective, as negamax expects.
+
+    Scores are reused from `eval_cache` if the position was already reached by another move order.
+    """
+    key = b.zhash
+    score = eval_cache.get(key)
+    if score is not None:
+        eval_cache.move_to_end(key)
+        return score
+    score = evaluate_position(b, hanging_cache) if b.turn else -evaluate_position(b, hanging_cache)
+    if len(eval_cache) >= EVAL_CACHE_MAX_ENTRIES:
+        eval_cache.popitem(last=False)
+    eval_cache[key] = score
+    return score
+
+
+# --- Simplified move ordering with safety checks ---
+def capture_score(b: chess.Board, move: chess.Move, moving_type: chess.PieceType) -> int:
+    """Score a capture by MVV-LVA (Most Valuable Victim - Least Valuable Attacker), penalizing losing trades."""
+    victim_type = b.piece_type_at(move.to_square)
+    if not victim_type:
+        return 0
+    score = MVV_LVA[(victim_type << 3) | moving_type]
+
+    # Only do the capture if it's a good trade: equal or winning material, or safe
+    moving_value = PIECE_VALUES[moving_type]
+    if PIECE_VALUES[victim_type] < moving_value - 100 and see_gain(b, move) < 0:
+        # Bad capture: we'd lose material in the exchange (e.g., Queen takes defended Pawn)
+        score -= moving_value * 24  # Heavy penalty
+    return score
+
+
+def check_bonus(b: chess.Board, move: chess.Move, moving_value: int) -> int:
+    """Score a checking move, but only if the checking piece is safe on its destination."""
+    if not move_gives_check(b, move):
+        return 0
+
+    # Count attackers/defenders of the destination as if the move had been made
+    occupied = (b.occupied ^ chess.BB_SQUARES[move.from_square]) | chess.BB_SQUARES[move.to_square]
+    opponent_attackers = b.attackers_mask(not b.turn, move.to_square, occupied)
+    our_defenders = b.attackers_mask(b.turn, move.to_square, occupied) & occupied
+
+    if not opponent_attackers:
+        # Safe check - small bonus
+        return 50
+    if our_defenders.bit_count() >= opponent_attackers.bit_count() and moving_value <= 320:
+        # Defended check - tiny bonus (only if cheap piece)
+        return 20
+    # No bonus for unsafe checks
+    return 0
+
+
+def update_history(history: list[int], move: chess.Move, depth: int) -> None:
+    """
+    Credit a quiet move that caused a cutoff `depth` plies from the horizon in the history table.
+
+    Every entry stays below HISTORY_LIMIT: the bonus is capped at the limit, so one halving of the table is
+    always enough to bring the entry back under it, however deep the search.
+    """
+    index = (move.from_square << 6) | move.to_square
+    history[index] += min(depth * depth, HISTORY_LIMIT)  # Cutoffs far from the leaves are worth more
+    if history[index] >= HISTORY_LIMIT:
+        history[:] = [score >> 1 for score in history]
+
+
+def quiet_score(b: chess.Board, move: chess.Move, moving_value: int, history: list[int],
+                killers: list[chess.Move | None] | None) -> int:
+    """Score a quiet move by killer and history bonuses, checking the destination is safe."""
+    score = 0
+    if killers and move in killers:
+        score += KILLER_SCORE  # Refuted a sibling position, likely good here too
+    score += history[(move.from_square << 6) | move.to_square]
+    see = see_gain(b, move)
+    if see < 0:
+        if see <= -moving_value:
+            # Piece would hang after this move!
+            score -= moving_value * 50  # MASSIVE penalty
+        else:
+            # Would lose material in trade
+            score += see * 10
+    return score
+
+
+def split_moves(captures: Iterable[chess.Move], quiets: Iterable[chess.Move],
+                tt_move: chess.Move | None) -> tuple[bool, list[chess.Move], list[chess.Move], list[chess.Move]]:
+    """
+    Read the move generators into captures, quiet promotions and other quiet moves, setting the TT move aside.
+
+    Returns: (whether the TT move was found, captures, promotions, quiet moves)
+    """
+    found_tt_move = False
+    capture_moves = []
+    promotions = []
+    quiet_moves = []
+    for m in captures:
+        if m == tt_move:
+            found_tt_move = True
+        else:
+            capture_moves.append(m)
+    for m in quiets:
+        if m == tt_move:
+            found_tt_move = True
+        elif m.promotion:
+            promotions.append(m)
+        else:
+            quiet_moves.append(m)
+    return found_tt_move, capture_moves, promotions, quiet_moves
+
+
+def order_moves(b: chess.Board, captures: Iterable[chess.Move], quiets: Iterable[chess.Move], *, history: list[int],
+                tt_move: chess.Move | None = None,
+                killers: list[chess.Move | None] | None = None) -> Iterator[chess.Move]:
+    """
+    Yield moves in order: TT move, good captures, killers, then quiet moves by history (avoiding hanging pieces).
+
+    Captures and quiet moves come in separately, straight from their generators, so no move needs an
+    `is_capture` test and each is read in a single pass. Moves are produced lazily, so a cutoff by the
+    TT move skips scoring the others altogether.
+    """
+
+    def move_score(move: chess.Move, is_capture: bool = False) -> int:
+        moving_type = b.piece_type_at(move.from_square)
+        if not moving_type:
+            return 0
+        moving_value = PIECE_VALUES[moving_type]
+
+        score = capture_score(b, move, moving_type) if is_capture else 0
+        if move.promotion:
+            score += (PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN]) * 10
+        score += check_bonus(b, move, moving_value)
+        if not is_capture and not move.promotion:
+            score += quiet_score(b, move, moving_value, history, killers)
+        return score
+
+    # Set the TT move aside while reading the generators; quiet promotions are ordered with the captures
+    found_tt_move, capture_moves, promotions, quiet_moves = split_moves(captures, quiets, tt_move)
+
+    # The best move from an earlier search of this position always goes first, before any scoring
+    if found_tt_move and tt_move is not None:
+        yield tt_move
+
+    # A single remaining move needs no ordering
+    if len(capture_moves) + len(promotions) + len(quiet_moves) <= 1:
+        yield from capture_moves
+        yield from promotions
+        yield from quiet_moves
+        return
+
+    # Captures are few and usually decide the cutoff, so sort them fully
+    scored_captures = [(move_score(m, True), m) for m in capture_moves]
+    scored_captures += [(move_score(m), m) for m in promotions]
+    scored_captures.sort(key=lambda pair: pair[0], reverse=True)
+    yield from (m for score, m in scored_captures if score >= 0)
+    losing_captures = [m for score, m in scored_captures if score < 0]
+
+    # Alpha-beta rarely gets past the first few quiet moves: only pick out the best ones
+    if len(quiet_moves) > QUIET_MOVES_SORTED:
+        best_quiets = heapq.nlargest(QUIET_MOVES_SORTED, quiet_moves, key=move_score)
+        yield from best_quiets
+        yield from losing_captures
+        yield from (m for m in quiet_moves if m not in best_quiets)
+    else:
+        quiet_moves.sort(key=move_score, reverse=True)
+        yield from quiet_moves
+        yield from losing_captures
+
+
 class ExampleEngine(MinimalEngine):
     """An example engine that all homemade engines inherit."""
 
@@ -81,7 +973,8 @@ class MyBot(ExampleEngine):
     - Pondering: reuses analysis from opponent's thinking time
     """
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Set up the transposition table, move ordering tables and caches, which last across searches."""
         super().__init__(*args, **kwargs)
         # Transposition table: THE KEY TO SPEED
         # When we search to depth 5, we evaluate thousands of positions.
@@ -94,22 +987,41 @@ class MyBot(ExampleEngine):
         #     we instantly retrieve the depth 4 evaluation instead of re-computing!
         #   - This can save THOUSANDS of node evaluations per move
         #
-        # Key: simplified FEN (position only, no move counters)
-        # Value: (depth_searched, evaluation, best_move_found)
-        self.transposition_table = {}
+        # Slot: low bits of the 64-bit Zobrist hash of the position (no move counters)
+        # Entry: zobrist_hash, depth_searched, evaluation (from the side to move), bound flag, best_move_found
+        # Fixed size and kept for the whole game: a slot is only overwritten by an equal or deeper search
+        # One array per field, so a miss only reads the key and a store allocates nothing (empty slots have depth -1)
+        self.tt_keys = array("Q", bytes(8 * TT_SIZE))
+        self.tt_depths = array("b", [-1]) * TT_SIZE
+        self.tt_values = array("q", bytes(8 * TT_SIZE))
+        self.tt_flags = array("b", bytes(TT_SIZE))
+        self.tt_moves: list[chess.Move | None] = [None] * TT_SIZE
+        
+        # Killer moves: two quiet moves per ply that recently caused a cutoff (reset every search)
+        self.killers: list[list[chess.Move | None]] = [[None, None] for _ in range(MAX_PLY)]
+        
+        # History heuristic: cutoff credit for quiet moves, indexed by (from_square << 6) | to_square.
+        # Kept across searches, halved at the start of each one so old credit fades
+        self.history: list[int] = [0] * 4096
+        
+        # Static evaluations by Zobrist hash, so transpositions skip evaluate's scans (reset every search)
+        self.eval_cache: OrderedDict[int, int] = OrderedDict()
+        
+        # Hanging-piece penalties by (piece placement, color), shared by positions with the same pieces
+        self.hanging_cache: dict[tuple[tuple[int, ...], chess.Color], int] = {}
         
         # Track time usage for adaptive time management
-        self.last_move_time = None
-        self.opponent_last_move_time = None
-        self.last_search_start = None
-        self.last_position_fen = None
+        self.last_move_time: float | None = None
+        self.opponent_last_move_time: float | None = None
+        self.last_search_start: float | None = None
+        self.last_position_key: int | None = None
         
         # Opponent strength estimation
-        self.opponent_move_times = []  # Track opponent's thinking times
-        self.position_evaluations = []  # Track how eval changes after opponent moves
+        self.opponent_move_times: list[float] = []  # Track opponent's thinking times
+        self.position_evaluations: list[int] = []  # Track how eval changes after opponent moves
         self.opponent_strength_estimate = 0.5  # 0=weak, 1=very strong (Stockfish level)
     
-    def estimate_opponent_strength(self, our_eval_before: float, our_eval_after: float, opponent_time: float):
+    def estimate_opponent_strength(self, our_eval_before: int, our_eval_after: int, opponent_time: float) -> None:
         """Estimate opponent strength based on move quality and speed.
         
         Strong opponents (like Stockfish):
@@ -145,10 +1057,15 @@ class MyBot(ExampleEngine):
         
         logger.debug(f"Opponent strength estimate: {self.opponent_strength_estimate:.2f} (move_quality={move_quality:.2f}, speed={speed_indicator:.2f})")
     
-    def calculate_time_for_move(self, remaining_time: float | None, position_complexity: int) -> tuple[float, float]:
-        """Calculate time budget for this move based on game state and opponent strength.
+    def calculate_time_for_move(self, remaining_time: float | None, increment: float, moves_to_go: int | None,
+                                move_number: int, position_complexity: int) -> tuple[float, float]:
+        """Calculate time budget for this move based on the clock, game state and opponent strength.
+        
+        The soft limit is this move's share of the clock: iterative deepening starts no new depth after it.
+        The hard limit aborts the search mid-iteration, and never spends more than half the clock.
+        When the time is for this move alone (`moves_to_go` is 1), both limits are nearly all of it.
         
-        Returns: (time_for_move, hard_deadline)
+        Returns: (soft_limit, hard_limit)
         """
         # Base maximum time per move
         BASE_MAX_TIME = 15.0
@@ -180,19 +1097,15 @@ class MyBot(ExampleEngine):
                 adaptive_max = max(adaptive_max, opponent_time_bonus)
                 logger.debug(f"Opponent took {self.opponent_last_move_time:.1f}s, matching their time")
         
-        # --- Base time allocation (conservative % of remaining time) ---
-        if remaining_time > 120:
-            # Plenty of time: use ~3% per move (expecting 30+ moves)
-            base_time = remaining_time / 30
-        elif remaining_time > 60:
-            # Moderate time: use ~4% per move
-            base_time = remaining_time / 25
-        elif remaining_time > 20:
-            # Low time: use ~5% per move
-            base_time = remaining_time / 20
-        else:
-            # Critical time: use ~10% per move, but move faster
-            base_time = remaining_time / 10
+        # --- The whole budget is for this move: a fixed move time, or the last move before the time control ---
+        if moves_to_go == 1:
+            time_for_move = min(adaptive_max, remaining_time * (1 - MOVE_TIME_MARGIN))
+            return time_for_move, time_for_move
+        
+        # --- Base time allocation: an even share of the clock over the moves still to play ---
+        # Without a moves-to-go count, assume the game lasts EXPECTED_GAME_MOVES (but at least MIN_MOVES_LEFT more)
+        moves_left = moves_to_go or max(MIN_MOVES_LEFT, EXPECTED_GAME_MOVES - move_number)
+        base_time = remaining_time / moves_left + INCREMENT_SHARE * increment
         
         # --- Adjust for position complexity ---
         # More pieces on board = more complex = need more time
@@ -216,38 +1129,42 @@ class MyBot(ExampleEngine):
                 # We were very fast last move, can afford more now
                 base_time *= 1.2
         
-        # Final time allocation: use base time but cap at adaptive max
-        time_for_move = min(adaptive_max, max(0.5, base_time))
-        
-        # Hard deadline: never exceed this (safety margin)
-        hard_deadline = min(adaptive_max, remaining_time * 0.9 if remaining_time else adaptive_max)
+        # Hard limit: a few soft budgets for an iteration that is nearly done, never half the clock or more
+        hard_limit = min(adaptive_max, 3 * base_time, 0.5 * remaining_time)
+        soft_limit = min(base_time, hard_limit)
         
-        return time_for_move, hard_deadline
+        return soft_limit, hard_limit
+
+    def store_transposition(self, key: int, depth: int, evaluation: int, flag: int, best_move: chess.Move | None) -> None:
+        """Store a search result unless its slot holds a deeper search (depth-preferred replacement)."""
+        index = key & TT_INDEX_MASK
+        if depth >= self.tt_depths[index] or self.tt_keys[index] == key:
+            self.tt_keys[index] = key
+            self.tt_depths[index] = depth
+            self.tt_values[index] = evaluation
+            self.tt_flags[index] = flag
+            self.tt_moves[index] = best_move
 
     def search(self, board: chess.Board, *args: HOMEMADE_ARGS_TYPE) -> PlayResult:
         """Search for the best move with iterative deepening and timeout protection."""
         
-        # --- Transposition Table Cleanup ---
-        current_fen = board.fen()
-        if self.last_position_fen is not None and self.last_position_fen != current_fen:
-            if len(self.transposition_table) > 50000:
-                keys_to_remove = list(self.transposition_table.keys())[:-20000]
-                for key in keys_to_remove:
-                    del self.transposition_table[key]
-                logger.debug(f"Cleaned transposition table: {len(self.transposition_table)} entries remain")
+        # Search on a copy that hashes itself incrementally; the caller's board is left untouched
+        board = ZobristBoard.from_board(board)
+        root_ply = len(board.move_stack)
+        current_key = board.zhash
         
         # Store eval before opponent's move (for strength estimation)
         eval_before_opponent_move = None
-        if self.last_position_fen is not None:
+        if self.last_position_key is not None:
             # We can estimate from transposition table or do a quick eval
-            pos_key = ' '.join(self.last_position_fen.split()[:4])
-            if pos_key in self.transposition_table:
-                _, eval_before_opponent_move, _ = self.transposition_table[pos_key]
+            index = self.last_position_key & TT_INDEX_MASK
+            if self.tt_keys[index] == self.last_position_key and self.tt_flags[index] == TT_EXACT:
+                eval_before_opponent_move = self.tt_values[index]
         
-        self.last_position_fen = current_fen
+        self.last_position_key = current_key
         
         # Track opponent's move timing
-        current_time = time.time()
+        current_time = time.monotonic()
         if self.last_search_start is not None:
             self.opponent_last_move_time = current_time - self.last_search_start
             self.opponent_move_times.append(self.opponent_last_move_time)
@@ -259,338 +1176,58 @@ class MyBot(ExampleEngine):
         time_limit = args[0] if (args and isinstance(args[0], Limit)) else None
         
         remaining = None
+        increment = 0.0
+        moves_to_go = None
         if time_limit is not None:
             if isinstance(time_limit.time, (int, float)):
+                # A fixed time for this move (e.g., the first move or a correspondence move), not a clock to share
                 remaining = time_limit.time
+                moves_to_go = 1
             elif board.turn == chess.WHITE:
                 remaining = time_limit.white_clock if isinstance(time_limit.white_clock, (int, float)) else None
+                increment = time_limit.white_inc if isinstance(time_limit.white_inc, (int, float)) else 0.0
             else:
                 remaining = time_limit.black_clock if isinstance(time_limit.black_clock, (int, float)) else None
+                increment = time_limit.black_inc if isinstance(time_limit.black_inc, (int, float)) else 0.0
+            moves_to_go = moves_to_go or time_limit.remaining_moves
         
         # Calculate position complexity (number of pieces)
-        position_complexity = len(board.piece_map())
+        position_complexity = board.occupied.bit_count()
         
         # Use sophisticated time management function
-        time_for_move, hard_deadline_time = self.calculate_time_for_move(remaining, position_complexity)
+        time_for_move, hard_deadline_time = self.calculate_time_for_move(remaining, increment, moves_to_go,
+                                                                         board.fullmove_number, position_complexity)
+        
+        logger.debug(f"Time allocated: {time_for_move:.2f}s, at most {hard_deadline_time:.2f}s "
+                     f"(remaining: {remaining}, complexity: {position_complexity}, "
+                     f"opponent strength: {self.opponent_strength_estimate:.2f})")
         
-        logger.debug(f"Time allocated: {time_for_move:.2f}s (remaining: {remaining}, complexity: {position_complexity}, opponent strength: {self.opponent_strength_estimate:.2f})")
+        # Killer moves and cached evaluations are only meaningful within one search tree
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.eval_cache.clear()
+        self.hanging_cache.clear()
+        history = self.history
+        history[:] = [score >> 1 for score in history]
         
-        # Start the clock
-        start_time = time.time()
+        # Start the clock. Nodes only poll it every TIME_CHECK_MASK + 1 visits, and raise TimeoutError
+        # once the deadline has passed, which unwinds the whole search back to the root
+        now = time.monotonic
+        start_time = now()
         deadline = start_time + hard_deadline_time
-
-        # Piece values
-        values = {
-            chess.PAWN: 100,
-            chess.KNIGHT: 320,
-            chess.BISHOP: 330,
-            chess.ROOK: 500,
-            chess.QUEEN: 900,
-            chess.KING: 0,  # king material ignored (checkmates handled separately)
-        }
-
-        # --- Piece-Square Tables (positional bonuses) ---
-        # Tables are from White's perspective (higher values = better for White)
-        # Black's pieces use the same table flipped vertically
-        # VALUES SCALED DOWN: Piece-square tables are now SUBTLE hints (2-5 points max)
-        # This prevents sacrificing pieces just to reach "good" squares
-        
-        PAWN_TABLE = [
-            0,  0,  0,  0,  0,  0,  0,  0,
-            5,  5,  5,  5,  5,  5,  5,  5,
-            1,  1,  2,  3,  3,  2,  1,  1,
-            0,  0,  1,  2,  2,  1,  0,  0,
-            0,  0,  0,  2,  2,  0,  0,  0,
-            0, -1, -1,  0,  0, -1, -1,  0,
-            0,  1,  1, -2, -2,  1,  1,  0,
-            0,  0,  0,  0,  0,  0,  0,  0
-        ]
-        
-        KNIGHT_TABLE = [
-            -5, -4, -3, -3, -3, -3, -4, -5,
-            -4, -2,  0,  0,  0,  0, -2, -4,
-            -3,  0,  1,  2,  2,  1,  0, -3,
-            -3,  0,  2,  3,  3,  2,  0, -3,
-            -3,  0,  2,  3,  3,  2,  0, -3,
-            -3,  0,  1,  2,  2,  1,  0, -3,
-            -4, -2,  0,  0,  0,  0, -2, -4,
-            -5, -4, -3, -3, -3, -3, -4, -5
-        ]
-        
-        BISHOP_TABLE = [
-            -2, -1, -1, -1, -1, -1, -1, -2,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -1,  0,  1,  1,  1,  1,  0, -1,
-            -1,  0,  1,  2,  2,  1,  0, -1,
-            -1,  0,  1,  2,  2,  1,  0, -1,
-            -1,  0,  1,  1,  1,  1,  0, -1,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -2, -1, -1, -1, -1, -1, -1, -2
-        ]
-        
-        ROOK_TABLE = [
-            0,  0,  0,  0,  0,  0,  0,  0,
-            1,  2,  2,  2,  2,  2,  2,  1,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            0,  0,  0,  1,  1,  0,  0,  0
-        ]
-        
-        QUEEN_TABLE = [
-            -2, -1, -1,  0,  0, -1, -1, -2,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -1,  0,  1,  1,  1,  1,  0, -1,
-            -1,  0,  1,  1,  1,  1,  0, -1,
-            -1,  0,  1,  1,  1,  1,  0, -1,
-            -1,  0,  1,  1,  1,  1,  0, -1,
-            -1,  0,  0,  0,  0,  0,  0, -1,
-            -2, -1, -1,  0,  0, -1, -1, -2
-        ]
-        
-        KING_MIDDLEGAME_TABLE = [
-            -3, -4, -4, -5, -5, -4, -4, -3,
-            -3, -4, -4, -5, -5, -4, -4, -3,
-            -3, -4, -4, -5, -5, -4, -4, -3,
-            -3, -4, -4, -5, -5, -4, -4, -3,
-            -2, -3, -3, -4, -4, -3, -3, -2,
-            -1, -2, -2, -2, -2, -2, -2, -1,
-            2,  2,  0,  0,  0,  0,  2,  2,
-            2,  3,  1,  0,  0,  1,  3,  2
-        ]
-        
-        KING_ENDGAME_TABLE = [
-            -5, -4, -3, -2, -2, -3, -4, -5,
-            -3, -2, -1,  0,  0, -1, -2, -3,
-            -3, -1,  2,  3,  3,  2, -1, -3,
-            -3, -1,  3,  4,  4,  3, -1, -3,
-            -3, -1,  3,  4,  4,  3, -1, -3,
-            -3, -1,  2,  3,  3,  2, -1, -3,
-            -3, -3,  0,  0,  0,  0, -3, -3,
-            -5, -3, -3, -3, -3, -3, -3, -5
-        ]
-        
-        piece_square_tables = {
-            chess.PAWN: PAWN_TABLE,
-            chess.KNIGHT: KNIGHT_TABLE,
-            chess.BISHOP: BISHOP_TABLE,
-            chess.ROOK: ROOK_TABLE,
-            chess.QUEEN: QUEEN_TABLE,
-            chess.KING: KING_MIDDLEGAME_TABLE  # Will switch to endgame dynamically
-        }
-
-        # --- Enhanced evaluation with piece-square tables ---
-        def evaluate(b: chess.Board) -> int:
-            # Large score for terminal outcomes
-            if b.is_game_over():
-                outcome = b.outcome()
-                if outcome is None or outcome.winner is None:
-                    return 0  # draw
-                return 10_000_000 if outcome.winner is chess.WHITE else -10_000_000
-
-            values = {
-                chess.PAWN: 100,
-                chess.KNIGHT: 320,
-                chess.BISHOP: 330,
-                chess.ROOK: 500,
-                chess.QUEEN: 900,
-                chess.KING: 0,  # king material ignored (checkmates handled above)
-            }
-            
-            # Material score
-            score = 0
-            for pt, v in values.items():
-                score += v * (len(b.pieces(pt, chess.WHITE)) - len(b.pieces(pt, chess.BLACK)))
-            
-            # Determine game phase based on the side with FEWER pieces
-            # This ensures endgame detection works even if one side has more pieces
-            white_pieces = len([1 for p in b.piece_map().values() if p.color == chess.WHITE])
-            black_pieces = len([1 for p in b.piece_map().values() if p.color == chess.BLACK])
-            min_pieces = min(white_pieces, black_pieces)
-            
-            # Endgame: when the side with fewer pieces has <= 5 pieces (including king)
-            is_endgame = min_pieces <= 5
-            
-            # Positional score from piece-square tables
-            for piece_type in [chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING]:
-                # Select appropriate king table
-                if piece_type == chess.KING:
-                    table = KING_ENDGAME_TABLE if is_endgame else KING_MIDDLEGAME_TABLE
-                else:
-                    table = piece_square_tables[piece_type]
-                
-                # White pieces (use table as-is)
-                for square in b.pieces(piece_type, chess.WHITE):
-                    score += table[square]
-                
-                # Black pieces (flip table vertically: rank 7 becomes rank 0, etc.)
-                for square in b.pieces(piece_type, chess.BLACK):
-                    flipped_square = square ^ 56  # XOR with 56 flips the rank
-                    score -= table[flipped_square]
-            
-            # --- Defensive enhancements ---
-            # SIMPLIFIED: Just check if pieces are hanging (undefended or under-defended)
-            hanging_penalty = 0
-            
-            for piece_type in [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT, chess.PAWN]:
-                piece_value = values[piece_type]
-                
-                # Check white pieces
-                for square in b.pieces(piece_type, chess.WHITE):
-                    black_attackers = list(b.attackers(chess.BLACK, square))
-                    if black_attackers:
-                        white_defenders = list(b.attackers(chess.WHITE, square))
-                        
-                        # Simple check: if more attackers than defenders, piece is hanging
-                        if len(black_attackers) > len(white_defenders):
-                            hanging_penalty += piece_value * 0.7
-                        elif len(black_attackers) > 0 and len(white_defenders) > 0:
-                            # Check if lowest attacker is cheaper than our piece
-                            min_attacker_value = min(values.get(b.piece_at(sq).piece_type, 0) 
-                                                     for sq in black_attackers if b.piece_at(sq))
-                            if piece_value > min_attacker_value + 150:
-                                # Bad trade possible (e.g., Queen vs Bishop)
-                                hanging_penalty += (piece_value - min_attacker_value) * 0.4
-                
-                # Check black pieces (symmetric)
-                for square in b.pieces(piece_type, chess.BLACK):
-                    white_attackers = list(b.attackers(chess.WHITE, square))
-                    if white_attackers:
-                        black_defenders = list(b.attackers(chess.BLACK, square))
-                        
-                        if len(white_attackers) > len(black_defenders):
-                            hanging_penalty -= piece_value * 0.7  # Good for us
-                        elif len(white_attackers) > 0 and len(black_defenders) > 0:
-                            min_attacker_value = min(values.get(b.piece_at(sq).piece_type, 0)
-                                                     for sq in white_attackers if b.piece_at(sq))
-                            if piece_value > min_attacker_value + 150:
-                                hanging_penalty -= (piece_value - min_attacker_value) * 0.4
-            
-            score -= hanging_penalty
-            
-            # Check king safety: count attackers near our king
-            if not is_endgame:
-                for color in (chess.WHITE, chess.BLACK):
-                    king_square = b.king(color)
-                    if king_square is None:
-                        continue
-                    opponent_color = not color
-                    king_danger = 0
-                    for sq in chess.SQUARES:
-                        if chess.square_distance(sq, king_square) <= 2:
-                            attackers = b.attackers(opponent_color, sq)
-                            king_danger += len(attackers) * 5
-                    if color == chess.WHITE:
-                        score -= king_danger
-                    else:
-                        score += king_danger
-            
-            # Bonus for controlling center (only in middlegame)
-            if not is_endgame:
-                center_squares = [chess.E4, chess.D4, chess.E5, chess.D5]
-                for sq in center_squares:
-                    white_control = len(b.attackers(chess.WHITE, sq))
-                    black_control = len(b.attackers(chess.BLACK, sq))
-                    score += (white_control - black_control) * 3
-            
-            return score
+        nodes = 0
         
-        # --- Simplified move ordering with safety checks ---
-        def order_moves(b: chess.Board, moves: list[chess.Move]) -> list[chess.Move]:
-            """Order moves: good captures first, avoid hanging pieces, then quiet moves."""
-            
-            def move_score(move: chess.Move) -> int:
-                score = 0
-                
-                moving_piece = b.piece_at(move.from_square)
-                if not moving_piece:
-                    return 0
-                
-                moving_value = values.get(moving_piece.piece_type, 0)
-                
-                # Captures: MVV-LVA (Most Valuable Victim - Least Valuable Attacker)
-                if b.is_capture(move):
-                    victim_piece = b.piece_at(move.to_square)
-                    if victim_piece:
-                        victim_value = values.get(victim_piece.piece_type, 0)
-                        
-                        # Only do the capture if it's a good trade
-                        if victim_value >= moving_value - 100:
-                            # Good capture: equal or winning material
-                            score = victim_value * 10 - moving_value
-                        else:
-                            # Bad capture: losing material (e.g., Queen takes Pawn)
-                            # Check if piece would be safe after capture
-                            b.push(move)
-                            to_square = move.to_square
-                            opponent_attackers = list(b.attackers(b.turn, to_square))  # turn switched
-                            our_defenders = list(b.attackers(not b.turn, to_square))
-                            b.pop()
-                            
-                            if len(opponent_attackers) > len(our_defenders):
-                                # We'd lose the piece after capturing
-                                score = victim_value * 10 - moving_value * 25  # Heavy penalty
-                            else:
-                                # Piece is defended, capture is okay
-                                score = victim_value * 10 - moving_value
-                
-                # Promotions
-                if move.promotion:
-                    promotion_value = values.get(move.promotion, 0)
-                    score += (promotion_value - values[chess.PAWN]) * 10
-                
-                # Check bonus - but ONLY if the piece is safe!
-                b.push(move)
-                gives_check = b.is_check()
-                b.pop()
-                
-                if gives_check:
-                    # Check if the checking piece is safe
-                    b.push(move)
-                    to_square = move.to_square
-                    opponent_attackers = list(b.attackers(b.turn, to_square))
-                    our_defenders = list(b.attackers(not b.turn, to_square))
-                    b.pop()
-                    
-                    if not opponent_attackers:
-                        # Safe check - small bonus
-                        score += 50
-                    elif len(our_defenders) >= len(opponent_attackers):
-                        # Defended check - tiny bonus (only if cheap piece)
-                        if moving_value <= 320:
-                            score += 20
-                    # else: no bonus for unsafe checks
-                
-                # Quiet moves: check if destination is safe
-                if not b.is_capture(move) and not move.promotion:
-                    b.push(move)
-                    to_square = move.to_square
-                    opponent_attackers = list(b.attackers(b.turn, to_square))
-                    
-                    if opponent_attackers:
-                        our_defenders = list(b.attackers(not b.turn, to_square))
-                        
-                        if len(opponent_attackers) > len(our_defenders):
-                            # Piece would hang after this move!
-                            score -= moving_value * 50  # MASSIVE penalty
-                        elif len(opponent_attackers) > 0:
-                            # Check if it's a bad trade
-                            min_attacker_value = min(values.get(b.piece_at(sq).piece_type, 0)
-                                                     for sq in opponent_attackers if b.piece_at(sq))
-                            if moving_value > min_attacker_value + 150:
-                                # Would lose material in trade
-                                score -= (moving_value - min_attacker_value) * 10
-                    
-                    b.pop()
-                
-                return score
-            
-            return sorted(moves, key=move_score, reverse=True)
+        # Probed at every node
+        tt_keys = self.tt_keys
+        tt_depths = self.tt_depths
+        tt_values = self.tt_values
+        tt_flags = self.tt_flags
+        tt_moves = self.tt_moves
+        # Passed to every evaluation
+        eval_cache = self.eval_cache
+        hanging_cache = self.hanging_cache
 
         # --- quiescence search with depth limit (prevents infinite loops) ---
-        def quiescence(b: chess.Board, alpha: float, beta: float, qs_depth: int = 0) -> int:
+        def quiescence(b: ZobristBoard, alpha: int, beta: int, qs_depth: int = 0) -> int:
             """Search only tactical moves (captures/checks) until position is quiet.
             
             CRITICAL: qs_depth parameter prevents infinite loops in quiescence.
@@ -599,195 +1236,252 @@ class MyBot(ExampleEngine):
             MAX_QS_DEPTH = 10  # Safety limit to prevent infinite recursion
             
             # Check timeout
-            if time.time() >= deadline:
-                return evaluate(b)
+            nonlocal nodes
+            nodes += 1
+            if not nodes & TIME_CHECK_MASK and now() >= deadline:
+                raise TimeoutError
             
             # Depth limit check (prevents infinite loops!)
             if qs_depth >= MAX_QS_DEPTH:
-                return evaluate(b)
+                return evaluate(b, eval_cache, hanging_cache)
             
             # Stand pat: evaluate current position without any moves
-            stand_pat = evaluate(b)
+            stand_pat = evaluate(b, eval_cache, hanging_cache)
             
-            # Check if we're in a terminal position
-            if b.is_game_over():
-                return stand_pat
+            # Beta cutoff: position is already too good for opponent
+            if stand_pat >= beta:
+                return beta
+            # Update alpha if standing pat is better
+            if stand_pat > alpha:
+                alpha = stand_pat
             
-            # Determine who's to move
-            maximizing = b.turn == chess.WHITE
+            # Bound methods used in the loops below (one attribute lookup per node instead of per move)
+            push = b.push
+            pop = b.pop
             
-            if maximizing:
-                # Beta cutoff: position is already too good for opponent
-                if stand_pat >= beta:
-                    return beta
-                # Update alpha if standing pat is better
-                if stand_pat > alpha:
-                    alpha = stand_pat
-            else:
-                # Alpha cutoff: position is already too bad for us
-                if stand_pat <= alpha:
-                    return alpha
-                # Update beta if standing pat is better
-                if stand_pat < beta:
-                    beta = stand_pat
-            
-            # Generate only tactical moves (captures and SAFE checks)
-            tactical_moves = []
-            for m in b.legal_moves:
-                if b.is_capture(m):
-                    # Always include captures
-                    tactical_moves.append(m)
-                elif b.gives_check(m):
-                    # Only include check if piece is safe afterwards
-                    moving_piece = b.piece_at(m.from_square)
-                    if moving_piece:
-                        moving_value = values.get(moving_piece.piece_type, 0)
-                        
-                        # Simulate the check
-                        b.push(m)
-                        to_square = m.to_square
-                        opponent_attackers = list(b.attackers(b.turn, to_square))
-                        our_defenders = list(b.attackers(not b.turn, to_square))
-                        b.pop()
-                        
-                        # Only include check if:
-                        # 1. Piece is not attacked, OR
-                        # 2. Piece is defended and it's a low-value piece (pawn/knight)
-                        if not opponent_attackers:
-                            tactical_moves.append(m)  # Safe check
-                        elif len(our_defenders) >= len(opponent_attackers) and moving_value <= 320:
-                            tactical_moves.append(m)  # Defended check with cheap piece
+            # Keep only tactical moves: all captures, and near the horizon quiet moves that are SAFE checks.
+            # Deeper down, looking for the checks costs more than it finds
+            safe_checks = []
+            if qs_depth < QS_CHECK_PLIES:
+                # Shared by every candidate check of this node
+                us = b.turn
+                them = not us
+                occupied_now = b.occupied
+                attackers_mask = b.attackers_mask
+                # Checks come with the moving piece's type, and only the safety of each is left to test
+                for moving_type, m in generate_quiet_checks(b):
+                    # Count attackers/defenders of the destination as if the move had been made
+                    to_square = m.to_square
+                    occupied = (occupied_now ^ chess.BB_SQUARES[m.from_square]) | chess.BB_SQUARES[to_square]
+                    opponent_attackers = attackers_mask(them, to_square, occupied)
+                    
+                    # Only include check if:
+                    # 1. Piece is not attacked, OR
+                    # 2. Piece is defended and it's a low-value piece (pawn/knight)
+                    # Defenders are only counted when the second case can apply
+                    if not opponent_attackers:
+                        safe_checks.append(m)  # Safe check
+                    elif PIECE_VALUES[moving_type] <= 320 and (
+                            (attackers_mask(us, to_square, occupied) & occupied).bit_count()
+                            >= opponent_attackers.bit_count()):
+                        safe_checks.append(m)  # Defended check with cheap piece
             
             # Sort tactical moves (MVV-LVA ordering helps quiescence too!)
-            ordered_tactical = order_moves(b, tactical_moves)
+            # Captures, plus the safe quiet checks found in the first QS_CHECK_PLIES plies; mate and stalemate
+            # are already scored by evaluate
+            ordered_tactical = order_moves(b, b.generate_legal_captures(), safe_checks, history=history)
             
             # Search tactical moves
             for m in ordered_tactical:
-                b.push(m)
-                score = quiescence(b, alpha, beta, qs_depth + 1)  # Increment depth!
-                b.pop()
+                push(m)
+                score = -quiescence(b, -beta, -alpha, qs_depth + 1)  # Increment depth!
+                pop()
                 
-                if maximizing:
-                    if score >= beta:
-                        return beta  # Beta cutoff
-                    if score > alpha:
-                        alpha = score
-                else:
-                    if score <= alpha:
-                        return alpha  # Alpha cutoff
-                    if score < beta:
-                        beta = score
+                if score >= beta:
+                    return beta  # Beta cutoff
+                if score > alpha:
+                    alpha = score
             
             # Return the best score we found
-            return alpha if maximizing else beta
+            return alpha
 
-        # --- Alpha-beta with timeout check and transposition table ---
-        def alphabeta(b: chess.Board, depth: int, alpha: float, beta: float, maximizing: bool, ply: int = 0) -> tuple[int, chess.Move | None]:
-            """Alpha-beta pruning with quiescence search, timeout protection, and transposition table.
+        def store_killer(b: chess.Board, move: chess.Move, ply: int, depth: int) -> None:
+            """Remember a quiet move that caused a cutoff: as a killer at this ply, and in the history table."""
+            if b.is_capture(move) or move.promotion:
+                return
+            update_history(history, move, depth)
+            if ply >= MAX_PLY:
+                return
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+
+        def is_draw(b: ZobristBoard) -> bool:
+            """
+            Check for a draw by the fifty-move rule, by repetition or by insufficient material.
+
+            The first two depend on the moves that led here, which the TT key knows nothing about.
+            """
+            # Fifty-move rule: a draw whatever the pieces say
+            # A position repeated inside the search tree is a draw: the side that repeated it could repeat it again
+            # Without enough material to mate (e.g., K+minor vs K), the static eval's material edge is worth nothing
+            return b.halfmove_clock >= 100 or b.is_repeated(root_ply) or b.is_insufficient_material()
+
+        # --- Negamax alpha-beta with timeout check and transposition table ---
+        def negamax(b: ZobristBoard, depth: int, alpha: int, beta: int, ply: int = 0) -> int:
+            """Negamax alpha-beta with quiescence search, timeout protection, and transposition table.
+            
+            Scores are from the side to move's perspective: a child's score is negated for its parent.
             
-            Returns: (evaluation, best_move)
+            Returns: evaluation (the best move is recorded in the transposition table)
             """
 
-            # Timeout check at every node
-            if time.time() >= deadline:
-                return evaluate(b), None
+            # Timeout check
+            nonlocal nodes
+            nodes += 1
+            if not nodes & TIME_CHECK_MASK and now() >= deadline:
+                raise TimeoutError
+            
+            # Checked before the TT, whose key has no move counters
+            if is_draw(b):
+                return 0
+            
+            alpha_orig = alpha
             
             # Check transposition table
-            # Use a simpler position key (FEN without move counters for better cache hits)
-            pos_key = ' '.join(b.fen().split()[:4])  # Position, color, castling, en passant (no move counters)
+            # Zobrist hash, updated incrementally by push/pop (position, color, castling, en passant)
+            pos_key = b.zhash
             
             # Try to retrieve from transposition table
-            if pos_key in self.transposition_table:
-                cached_depth, cached_eval, cached_move = self.transposition_table[pos_key]
+            cached_move = None
+            tt_index = pos_key & TT_INDEX_MASK
+            if tt_keys[tt_index] == pos_key:
+                cached_move = tt_moves[tt_index]
                 # Only use cached result if it was searched to equal or greater depth
-                if cached_depth >= depth:
+                if tt_depths[tt_index] >= depth:
                     # HUGE SPEEDUP: We already analyzed this position deeply enough!
                     # This is where we save time from previous searches
-                    return cached_eval, cached_move
+                    cached_eval = tt_values[tt_index]
+                    cached_flag = tt_flags[tt_index]
+                    if cached_flag == TT_EXACT:
+                        return cached_eval
+                    # A bound from a cutoff still narrows the window, and may close it outright
+                    if cached_flag == TT_LOWER:
+                        if cached_eval > alpha:
+                            alpha = cached_eval
+                    elif cached_eval < beta:
+                        beta = cached_eval
+                    if alpha >= beta:
+                        return cached_eval
             
             # At leaf nodes, enter quiescence search
             if depth == 0:
-                return quiescence(b, alpha, beta, qs_depth=0), None
+                return quiescence(b, alpha, beta, qs_depth=0)
             
-            if b.is_game_over():
-                outcome = b.outcome()
-                if outcome is None or outcome.winner is None:
-                    # Draw - evaluate based on material balance
-                    eval_score = evaluate(b)
-                    # If we're losing, prefer the draw
-                    if (b.turn == chess.WHITE and eval_score < -200) or \
-                       (b.turn == chess.BLACK and eval_score > 200):
-                        return 0, None  # Draw is acceptable when losing
-                    return eval_score, None  # Otherwise use material evaluation
-                # Checkmate: return huge score adjusted by ply (prefer faster mates)
-                if outcome.winner == chess.WHITE:
-                    return 10_000_000 - ply, None
-                else:
-                    return -10_000_000 + ply, None
+            in_check = b.is_check()
 
-            # Order moves: try cached move first (from previous search), then captures
-            legal_moves = list(b.legal_moves)
-            
-            # CRITICAL OPTIMIZATION: Try the cached best move first
-            # This move was best in a previous search, so it's likely still good
+            # Null-move pruning: if passing still fails high on a reduced search, a real move will too.
+            # Not in check (passing would be illegal), not twice in a row, and only with pieces left
+            # besides pawns, since pawn endgames are where zugzwang makes passing look too good.
+            # Last, there must be a legal move: passing in a stalemate would fail high instead of scoring a draw
+            if (depth >= NULL_MOVE_MIN_DEPTH and b.move_stack and b.move_stack[-1]
+                    and b.occupied_co[b.turn] & ~(b.pawns | b.kings) and not in_check
+                    and any(b.generate_legal_moves())):
+                b.push(chess.Move.null())
+                val = -negamax(b, depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + 1, ply + 1)
+                b.pop()
+                if val >= beta:
+                    return beta
+
+            # Order moves: try cached move first (from previous search), then captures and killers
+            # CRITICAL OPTIMIZATION: The cached move was best in a previous search, so it's likely still good
             # This dramatically improves alpha-beta pruning efficiency
-            cached_move_to_try = None
-            if pos_key in self.transposition_table:
-                _, _, cached_move = self.transposition_table[pos_key]
-                if cached_move and cached_move in legal_moves:
-                    cached_move_to_try = cached_move
-                    legal_moves.remove(cached_move)
+            killers = self.killers[ply] if ply < MAX_PLY else None
+            ordered_moves = order_moves(b, b.generate_legal_captures(), generate_quiet_moves(b), history=history,
+                                        tt_move=cached_move, killers=killers)
             
-            # Order remaining moves by MVV-LVA (captures first)
-            ordered_moves = order_moves(b, legal_moves)
+            best_move_found = None
+            best_eval = -10**12
+            for i, m in enumerate(ordered_moves):
+                # Late quiet moves: ordering put them behind the TT move, captures, killers and the best by history
+                late_quiet = i >= LMR_MIN_MOVE_INDEX and not in_check and not m.promotion and not b.is_capture(m)
+                if late_quiet and depth == 1 and i >= LMP_MIN_MOVE_INDEX and not move_gives_check(b, m):
+                    continue  # Late move pruning: so close to the horizon, a quiet move this late won't raise alpha
+                b.push(m)
+                if depth == 1:
+                    # Children are leaves: go straight to quiescence, skipping a negamax frame and TT probe,
+                    # but not the draw checks negamax would make first
+                    val = 0 if is_draw(b) else -quiescence(b, -beta, -alpha)
+                elif i == 0:
+                    # Principal variation search: the first move gets the full window...
+                    val = -negamax(b, depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    # ...the rest only have to be proven no better than alpha, with a null window.
+                    # Late move reduction: late quiet moves are tried a ply shallower first, then at full depth
+                    # if they beat alpha
+                    if late_quiet and depth >= LMR_MIN_DEPTH and not b.is_check():
+                        val = -negamax(b, depth - 2, -alpha - 1, -alpha, ply + 1)
+                        if val > alpha:
+                            val = -negamax(b, depth - 1, -alpha - 1, -alpha, ply + 1)
+                    else:
+                        val = -negamax(b, depth - 1, -alpha - 1, -alpha, ply + 1)
+                    # A move that beats alpha inside the window gets its exact score from a full-window search
+                    if alpha < val < beta:
+                        val = -negamax(b, depth - 1, -beta, -alpha, ply + 1)
+                b.pop()
+                if val > best_eval:
+                    best_eval = val
+                    best_move_found = m
+                if best_eval > alpha:
+                    alpha = best_eval
+                if alpha >= beta:
+                    store_killer(b, m, ply, depth)
+                    break  # Beta cutoff
             
-            # Put cached move at the front
-            if cached_move_to_try:
-                ordered_moves.insert(0, cached_move_to_try)
+            # No moves were generated: checkmate or stalemate
+            if best_move_found is None:
+                return terminal_score(b, ply)
             
-            best_move_found = None
-
-            if maximizing:
-                max_eval = -10**12
-                fully_searched = True
-                for m in ordered_moves:
-                    b.push(m)
-                    val, _ = alphabeta(b, depth - 1, alpha, beta, False, ply + 1)
-                    b.pop()
-                    if val > max_eval:
-                        max_eval = val
-                        best_move_found = m
-                    if max_eval > alpha:
-                        alpha = max_eval
-                    if alpha >= beta:
-                        fully_searched = False
-                        break  # Beta cutoff
-                
-                if fully_searched and best_move_found is not None and time.time() < deadline:
-                    self.transposition_table[pos_key] = (depth, max_eval, best_move_found)
-                return max_eval, best_move_found
+            # Cutoff nodes are stored too, as bounds
+            if best_eval <= alpha_orig:
+                flag = TT_UPPER
+            elif best_eval >= beta:
+                flag = TT_LOWER
             else:
-                min_eval = 10**12
-                fully_searched = True
-                for m in ordered_moves:
-                    b.push(m)
-                    val, _ = alphabeta(b, depth - 1, alpha, beta, True, ply + 1)
-                    b.pop()
-                    if val < min_eval:
-                        min_eval = val
-                        best_move_found = m
-                    if min_eval < beta:
-                        beta = min_eval
+                flag = TT_EXACT
+            self.store_transposition(pos_key, depth, best_eval, flag, best_move_found)
+            return best_eval
+
+        def search_root(moves: list[chess.Move], depth: int, alpha: int, beta: int) -> tuple[int, chess.Move | None]:
+            """Search the root moves within (alpha, beta), stopping at a fail high.
+
+            Returns: (best_eval, best_move)
+            """
+            best_eval = -10**12
+            best_move = None
+            for m in moves:
+                board.push(m)
+                if best_move is None:
+                    val = -negamax(board, depth - 1, -beta, -alpha, ply=1)
+                else:
+                    # Principal variation search, as in negamax: a null window first, the full window if it beats alpha
+                    val = -negamax(board, depth - 1, -alpha - 1, -alpha, ply=1)
+                    if alpha < val < beta:
+                        val = -negamax(board, depth - 1, -beta, -alpha, ply=1)
+                board.pop()
+
+                if val > best_eval:
+                    best_eval = val
+                    best_move = m
+                if val > alpha:
+                    alpha = val
                     if alpha >= beta:
-                        fully_searched = False
-                        break  # Alpha cutoff
-                
-                if fully_searched and best_move_found is not None and time.time() < deadline:
-                    self.transposition_table[pos_key] = (depth, min_eval, best_move_found)
-                return min_eval, best_move_found
+                        break
+            return best_eval, best_move
 
         # --- Iterative deepening search ---
-        def iterative_deepening_search(legal_moves: list[chess.Move]) -> tuple[chess.Move, int, int]:
+        def iterative_deepening_search() -> tuple[chess.Move, int, int]:
             """Search with iterative deepening: depth 1, 2, 3... until time runs out.
 
             Benefits:
@@ -797,58 +1491,53 @@ class MyBot(ExampleEngine):
 
             Returns: (best_move, best_eval, deepest_completed_depth)
             """
-            ordered = order_moves(board, legal_moves)
+            # Reused by every iteration
+            ordered = list(order_moves(board, board.generate_legal_captures(), generate_quiet_moves(board), history=history))
 
             best_move: chess.Move | None = None
             best_eval = 0
             last_completed_depth = 0
 
-            import math
-            if time_for_move < 0.3:
-                max_depth_target = 2  # Emergency
-            else:
-                max_depth_target = round(math.log(3 * time_for_move) / math.log(3)) + 3
-                max_depth_target = max(2, min(8, max_depth_target))
-
             depth = 1
 
-            while depth <= max_depth_target:
-                elapsed = time.time() - start_time
-                if elapsed >= time_for_move * 0.85:
+            # Deepen until the soft limit has passed; the hard deadline interrupts an iteration that runs long
+            while depth < MAX_PLY:
+                if now() - start_time >= time_for_move:
                     break
 
-                alpha = -10**12
-                beta = 10**12
-                current_best_move = best_move
-                current_best_eval = -10**12 if board.turn == chess.WHITE else 10**12
+                # Aspiration window: expect a score close to the last iteration's (the first one gets a full window)
+                if last_completed_depth:
+                    alpha = best_eval - ASPIRATION_WINDOW
+                    beta = best_eval + ASPIRATION_WINDOW
+                else:
+                    alpha = -10**12
+                    beta = 10**12
 
                 iteration_complete = True
-                for m in ordered:
-                    if time.time() >= deadline:
-                        iteration_complete = False
-                        break
-
-                    board.push(m)
-                    val, _ = alphabeta(board, depth - 1, alpha, beta, board.turn == chess.WHITE, ply=1)
-                    board.pop()
-
-                    if board.turn == chess.WHITE:
-                        if val > current_best_eval:
-                            current_best_eval = val
-                            current_best_move = m
-                        if val > alpha:
-                            alpha = val
-                    else:
-                        if val < current_best_eval:
-                            current_best_eval = val
-                            current_best_move = m
-                        if val < beta:
-                            beta = val
+                try:
+                    while True:
+                        current_best_eval, current_best_move = search_root(ordered, depth, alpha, beta)
+                        # Outside the window the score is only a bound: widen that side once, then open it fully
+                        if current_best_eval <= alpha:
+                            alpha = alpha - ASPIRATION_WIDEN if alpha == best_eval - ASPIRATION_WINDOW else -10**12
+                        elif current_best_eval >= beta:
+                            beta = beta + ASPIRATION_WIDEN if beta == best_eval + ASPIRATION_WINDOW else 10**12
+                        else:
+                            break
+                except TimeoutError:
+                    # The search was abandoned mid-tree: take back the moves it left on the board
+                    iteration_complete = False
+                    while len(board.move_stack) > root_ply:
+                        board.pop()
 
                 if iteration_complete:
                     best_move = current_best_move
                     best_eval = current_best_eval
                     last_completed_depth = depth
+                    # The principal variation's first move is searched first in the next iteration
+                    if best_move is not None:
+                        ordered.remove(best_move)
+                        ordered.insert(0, best_move)
                     logger.debug(f"Depth {depth} completed: {best_move} with eval {best_eval}")
 
                     if abs(best_eval) > 9_000_000:
@@ -863,7 +1552,7 @@ class MyBot(ExampleEngine):
             if best_move is None and ordered:
                 best_move = ordered[0]
                 board.push(best_move)
-                best_eval = evaluate(board)
+                best_eval = -evaluate(board, eval_cache, hanging_cache)
                 board.pop()
 
             return best_move, best_eval, last_completed_depth
@@ -875,7 +1564,7 @@ class MyBot(ExampleEngine):
             return PlayResult(random.choice(list(board.legal_moves)), None)
 
         # Use iterative deepening for smart time management
-        best_move, best_eval, completed_depth = iterative_deepening_search(legal)
+        best_move, best_eval, completed_depth = iterative_deepening_search()
 
         # Fallback in rare cases (shouldn't trigger)
         if best_move is None:
@@ -888,9 +1577,9 @@ class MyBot(ExampleEngine):
             # Estimate opponent strength based on their previous move
             self.estimate_opponent_strength(eval_before_opponent_move, best_eval, self.opponent_last_move_time)
 
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         self.last_move_time = elapsed  # Track for adaptive time management
-        self.last_search_start = time.time()  # Track when we finished (opponent starts thinking)
+        self.last_search_start = time.monotonic()  # Track when we finished (opponent starts thinking)
         
         logger.info(f"Move: {best_move} | Time: {elapsed:.2f}s | Eval: {best_eval} | Depth: {completed_depth} | Opponent strength: {self.opponent_strength_estimate:.2f}")
 
@@ -685,7 +685,7 @@ def play_game(li: lichess.Lichess,
 
         disconnect_time = correspondence_disconnect_time if not game.state.get("moves") else seconds(0)
         prior_game = None
-        board = chess.Board()
+        board = setup_board(game)
         game_stream = itertools.chain([json.dumps(game.state).encode("utf-8")], lines)
         quit_after_all_games_finish = config.quit_after_all_games_finish
         stay_in_game = True
@@ -698,7 +698,7 @@ def play_game(li: lichess.Lichess,
                     conversation.react(ChatLine(upd))
                 elif u_type == "gameState":
                     game.state = upd
-                    board = setup_board(game)
+                    board = update_board(board, game)
                     takeback_field = game.state.get("btakeback") if game.is_white else game.state.get("wtakeback")
 
                     if not is_game_over(game) and is_engine_move(game, prior_game, board):
@@ -839,14 +839,34 @@ def setup_board(game: model.Game) -> chess.Board:
         VariantBoard = find_variant(game.variant_name)
         board = VariantBoard()
 
-    for move in game.state["moves"].split():
+    push_moves(board, game.state["moves"].split())
+    return board
+
+
+def update_board(board: chess.Board, game: model.Game) -> chess.Board:
+    """
+    Bring the board up to date with the moves in the game state.
+
+    Only the moves played since the last update are pushed. If the board's last move does not match the game's moves
+    (e.g., after a takeback), the board is set up again from the start.
+    """
+    moves = game.state["moves"].split()
+    played = len(board.move_stack)
+    if played > len(moves) or (played and board.move_stack[-1].uci() != moves[played - 1]):
+        return setup_board(game)
+
+    push_moves(board, moves[played:])
+    return board
+
+
+def push_moves(board: chess.Board, moves: list[str]) -> None:
+    """Play a list of moves in UCI notation on the board, skipping any that are illegal."""
+    for move in moves:
         try:
             board.push_uci(move)
         except ValueError:
             logger.exception(f"Ignoring illegal move {move} on board {board.fen()}")
 
-    return board
-
 
 def is_engine_move(game: model.Game, prior_game: model.Game | None, board: chess.Board) -> bool:
     """Check whether it is the engine's turn."""
@@ -0,0 +1,228 @@
+"""Tests for the search helpers in homemade.py."""
+
+import random
+import pytest
+from collections.abc import Callable, Iterator
+import chess
+import chess.polyglot
+import chess.variant
+from chess.engine import Limit
+from homemade import (HISTORY_LIMIT, KILLER_SCORE, MyBot, VariantZobristBoard, ZobristBoard, generate_quiet_checks,
+                      generate_quiet_moves, see_gain, update_history)
+from lib.config import Configuration
+
+
+def play_random_moves(board: chess.Board, rng: random.Random, plies: int,
+                      prefer: Callable[[chess.Board, chess.Move], bool] | None = None,
+                      prefer_share: float = 0.0) -> Iterator[None]:
+    """
+    Play up to `plies` random legal moves on `board`, yielding after each one so the caller can check the position.
+
+    Moves for which `prefer` is true are picked `prefer_share` of the time, so rarer positions come up more often.
+    """
+    for _ in range(plies):
+        moves = list(board.legal_moves)
+        if not moves:
+            return
+        preferred = [move for move in moves if prefer(board, move)] if prefer else []
+        board.push(rng.choice(preferred if preferred and rng.random() < prefer_share else moves))
+        yield
+
+
+def test_zobrist_board_matches_polyglot_hash() -> None:
+    """Test that the incremental hash matches a full rehash through pushes, pops and null moves."""
+    rng = random.Random(2025)
+    for game in range(50):
+        if game % 5 == 0:
+            board = ZobristBoard(chess.Board.from_chess960_pos(game * 19).fen(), chess960=True)
+        else:
+            board = ZobristBoard()
+        for _ in play_random_moves(board, rng, 120):
+            assert board.zhash == chess.polyglot.zobrist_hash(board)
+            if not board.is_check() and rng.random() < 0.05:
+                board.push(chess.Move.null())
+                assert board.zhash == chess.polyglot.zobrist_hash(board)
+            if rng.random() < 0.2:
+                board.pop()
+                assert board.zhash == chess.polyglot.zobrist_hash(board)
+
+
+def test_zobrist_board_castling_rights() -> None:
+    """Test that losing castling rights, by moving the king or a rook or by losing a rook, changes the hash."""
+    for ucis in (["e1e2"], ["h1h2"], ["a1a8"], ["e1g1"], ["h1h7", "a8a1"]):
+        board = ZobristBoard("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+        for uci in ucis:
+            board.push_uci(uci)
+            assert board.zhash == chess.polyglot.zobrist_hash(board)
+        while board.move_stack:
+            board.pop()
+            assert board.zhash == chess.polyglot.zobrist_hash(board)
+
+
+def test_zobrist_board_en_passant() -> None:
+    """Test that the en passant square is hashed only while a pawn can capture on it."""
+    for fen in ("4k3/8/8/8/3p4/8/4P3/4K3 w - - 0 1", "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"):
+        board = ZobristBoard(fen)
+        board.push_uci("e2e4")
+        assert board.zhash == chess.polyglot.zobrist_hash(board)
+        board.push_uci("e8d8")
+        assert board.zhash == chess.polyglot.zobrist_hash(board)
+
+
+def test_zobrist_board_special_moves() -> None:
+    """Test castling, en passant and promotion, and copying a board with its move stack."""
+    board = chess.Board("r3k2r/1P6/8/8/1p6/8/P7/R3K2R w KQkq - 0 1")
+    for uci in ["a2a4", "b4a3", "e1c1", "e8g8", "b7a8q", "f8a8"]:
+        board.push_uci(uci)
+        zobrist_board = ZobristBoard.from_board(board)
+        assert zobrist_board.zhash == chess.polyglot.zobrist_hash(board)
+        assert zobrist_board.move_stack == board.move_stack
+
+    zobrist_board = ZobristBoard.from_board(board).copy(stack=3)
+    while zobrist_board.move_stack:
+        zobrist_board.pop()
+        assert zobrist_board.zhash == chess.polyglot.zobrist_hash(zobrist_board)
+
+
+def test_zobrist_board_variants() -> None:
+    """Test that variant boards keep their rules, and that their hash is restored by pop."""
+    board = chess.variant.CrazyhouseBoard("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R[Pp] w KQkq - 0 4")
+    board.push_uci("P@d5")
+    zobrist_board = ZobristBoard.from_board(board)
+    assert isinstance(zobrist_board, VariantZobristBoard) and isinstance(zobrist_board, chess.variant.CrazyhouseBoard)
+    assert zobrist_board.fen() == board.fen()
+    assert zobrist_board.move_stack == board.move_stack
+    zhash = zobrist_board.zhash
+    for move in list(zobrist_board.legal_moves):
+        zobrist_board.push(move)
+        assert zobrist_board.zhash == zobrist_board.full_hash()
+        zobrist_board.pop()
+        assert zobrist_board.zhash == zhash
+    # The same placement with different pockets is a different position
+    assert (ZobristBoard.from_board(chess.variant.CrazyhouseBoard("8/8/8/8/8/8/8/K6k[P] w - - 0 1")).zhash
+            != ZobristBoard.from_board(chess.variant.CrazyhouseBoard("8/8/8/8/8/8/8/K6k[p] w - - 0 1")).zhash)
+
+
+def test_search_variants() -> None:
+    """Test that the search returns a legal move on crazyhouse and chess960 boards."""
+    crazyhouse = chess.variant.CrazyhouseBoard("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R[Pp] w KQkq - 0 4")
+    chess960 = chess.Board.from_chess960_pos(100)
+    chess960.push_uci("e2e4")
+    for board in (crazyhouse, chess960):
+        fen = board.fen()
+        engine = MyBot([], {}, None, Configuration({}), None)
+        result = engine.search(board, Limit(time=0.2))
+        assert result.move in list(board.legal_moves)
+        assert board.fen() == fen
+
+
+def test_zobrist_board_is_repeated() -> None:
+    """Test that repetitions count twofold inside the search tree and threefold before it, never across a pawn move."""
+    rng = random.Random(7)
+    for _ in range(20):
+        board = ZobristBoard()
+        # Mostly knight and king moves, so positions recur
+        for _ in play_random_moves(board, rng, 80,
+                                   lambda board, move: board.piece_type_at(move.from_square) in (chess.KNIGHT, chess.KING),
+                                   0.9):
+            assert board.is_repeated(0) == board.is_repetition(2)
+            assert board.is_repeated(len(board.move_stack)) == board.is_repetition(3)
+
+    board = ZobristBoard()
+    for uci in ["g1f3", "g8f6", "f3g1", "f6g8"]:
+        board.push_uci(uci)
+    assert board.is_repeated(0)
+    # The same twofold repetition, but played before the search started
+    assert not board.is_repeated(4)
+    for uci in ["g1f3", "g8f6", "f3g1", "f6g8"]:
+        board.push_uci(uci)
+    assert board.is_repeated(8)
+    board.push_uci("e2e4")
+    assert not board.is_repeated(0)
+
+
+def test_see_gain() -> None:
+    """Test static exchange evaluation on defended captures, x-ray recaptures and a losing queen capture."""
+    cases = [
+        # Undefended pawn: won outright
+        ("4k3/8/8/3p4/8/8/8/3QK3 w - - 0 1", "d1d5", 100),
+        # Pawn takes a pawn defended by a pawn: even trade
+        ("4k3/8/4p3/3p4/4P3/8/8/4K3 w - - 0 1", "e4d5", 0),
+        # Knight takes a pawn defended by a pawn: the knight is lost for it
+        ("4k3/8/4p3/3p4/8/2N5/8/4K3 w - - 0 1", "c3d5", 100 - 320),
+        # One rook against the defending rook loses the exchange...
+        ("3r2k1/8/8/3p4/8/8/3R4/4K3 w - - 0 1", "d2d5", 100 - 500),
+        # ...but the rook behind it recaptures through the first one's square (x-ray), winning the pawn
+        ("3r2k1/8/8/3p4/8/8/3R4/3RK3 w - - 0 1", "d2d5", 100),
+        # Queen takes a pawn defended by a pawn: losing
+        ("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1", "d1d5", 100 - 900),
+    ]
+    for fen, uci, gain in cases:
+        board = chess.Board(fen)
+        assert see_gain(board, chess.Move.from_uci(uci)) == gain
+
+
+def test_generate_quiet_checks() -> None:
+    """Test that the quiet checks are exactly the quiet moves that give check, with the type of the moving piece."""
+    rng = random.Random(3)
+    for game in range(60):
+        board = chess.Board.from_chess960_pos(game * 7) if game % 4 == 0 else chess.Board()
+        board.chess960 = game % 4 == 0
+        # Play checks now and then, so discovered checks and promotions come up
+        for _ in play_random_moves(board, rng, 150, chess.Board.gives_check, 0.3):
+            expected = {(board.piece_type_at(move.from_square), move)
+                        for move in generate_quiet_moves(board) if board.gives_check(move)}
+            checks = list(generate_quiet_checks(board))
+            assert len(checks) == len(expected) and set(checks) == expected
+
+
+def test_generate_quiet_checks_promotion() -> None:
+    """Test that promotions giving check come with the pawn type, and only to the pieces that do give check."""
+    board = chess.Board("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+    assert set(generate_quiet_checks(board)) == {(chess.PAWN, chess.Move.from_uci("b7b8q")),
+                                                 (chess.PAWN, chess.Move.from_uci("b7b8r"))}
+    # Here only an underpromotion to a knight gives check
+    board = chess.Board("8/1P1k4/8/8/8/8/8/4K3 w - - 0 1")
+    assert set(generate_quiet_checks(board)) == {(chess.PAWN, chess.Move.from_uci("b7b8n"))}
+
+
+def test_update_history_stays_below_killers() -> None:
+    """Test that history scores stay below HISTORY_LIMIT, and so below killers, even for very deep cutoffs."""
+    rng = random.Random(11)
+    moves = list(chess.Board().legal_moves)
+    history = [0] * 4096
+    for _ in range(1000):
+        update_history(history, rng.choice(moves), rng.choice([1, 5, 20, 40, 64]))
+        assert max(history) < HISTORY_LIMIT < KILLER_SCORE
+    # A single cutoff at a depth whose square is far above the limit
+    history = [HISTORY_LIMIT - 1] * 4096
+    update_history(history, moves[0], 60)
+    assert max(history) < HISTORY_LIMIT
+
+
+def test_calculate_time_for_move() -> None:
+    """Test the soft and hard time limits at a low clock, with an increment, and with a moves-to-go count."""
+    engine = MyBot([], {}, None, Configuration({}), None)
+    # No clock: the base maximum
+    assert engine.calculate_time_for_move(None, 0, None, 1, 32) == (15.0, 15.0)
+
+    # Low clock: an even share of it over the moves expected to be left, and never half the clock
+    soft, hard = engine.calculate_time_for_move(2.0, 0, None, 30, 15)
+    assert soft == pytest.approx(2.0 / 30)
+    assert hard == pytest.approx(3 * 2.0 / 30)
+
+    # The increment adds most of itself to the share...
+    soft, hard = engine.calculate_time_for_move(60.0, 2.0, None, 10, 15)
+    assert soft == pytest.approx(60.0 / 50 + 0.8 * 2.0)
+    assert hard == pytest.approx(3 * soft)
+    # ...but a large increment on a low clock still can't take half the clock
+    soft, hard = engine.calculate_time_for_move(1.0, 2.0, None, 10, 15)
+    assert soft == hard == pytest.approx(0.5)
+
+    # Moves to go replace the expected game length
+    soft, hard = engine.calculate_time_for_move(100.0, 0, 10, 10, 15)
+    assert soft == pytest.approx(10.0)
+    assert hard == pytest.approx(15.0)
+    # The last move before the time control (or a fixed move time) gets nearly all of it, up to the maximum
+    assert engine.calculate_time_for_move(10.0, 0, 1, 10, 15) == pytest.approx((9.0, 9.0))
+    assert engine.calculate_time_for_move(60.0, 0, 1, 10, 15) == pytest.approx((15.0, 15.0))
@@ -0,0 +1,49 @@
+"""Tests for the board bookkeeping in lichess_bot.py."""
+
+import datetime
+import chess
+from lib import model
+from lib.lichess_bot import setup_board, update_board
+from lib.lichess_types import GameEventType
+
+
+def make_game(moves: str) -> model.Game:
+    """Create a standard game whose state has the given moves."""
+    game: GameEventType = {"id": "zzzzzzzz", "variant": {"key": "standard", "name": "Standard", "short": "Std"},
+                           "speed": "bullet", "perf": {"name": "Bullet"}, "rated": False, "createdAt": 1700000000000,
+                           "white": {"id": "c", "name": "c", "title": None, "rating": 2000},
+                           "black": {"id": "b", "name": "b", "title": "BOT", "rating": 3000},
+                           "initialFen": "startpos", "clock": {"initial": 90000, "increment": 1000}, "type": "gameFull",
+                           "state": {"type": "gameState", "moves": moves, "wtime": 90000, "btime": 90000, "winc": 1000,
+                                     "binc": 1000, "status": "started"}}
+    return model.Game(game, "b", "https://lichess.org/", datetime.timedelta(seconds=30))
+
+
+def assert_updated(old_moves: str, new_moves: str) -> None:
+    """Test that updating a board from `old_moves` to `new_moves` gives the board set up from `new_moves`."""
+    board = setup_board(make_game(old_moves))
+    new_game = make_game(new_moves)
+    updated = update_board(board, new_game)
+    expected = setup_board(new_game)
+    assert updated == expected
+    assert updated.move_stack == expected.move_stack
+
+
+def test_update_board_extension() -> None:
+    """Test that a board one move behind catches up."""
+    assert_updated("e2e4 e7e5 g1f3", "e2e4 e7e5 g1f3 b8c6")
+    assert_updated("", "e2e4")
+
+
+def test_update_board_takeback() -> None:
+    """Test that a takeback, which shortens the move list, takes the board back."""
+    assert_updated("e2e4 e7e5 g1f3 b8c6", "e2e4 e7e5")
+    assert_updated("e2e4", "")
+
+
+def test_update_board_diverging_move() -> None:
+    """Test that a last move different from the board's replaces it."""
+    assert_updated("e2e4 e7e5 g1f3", "e2e4 e7e5 f1c4")
+    assert_updated("e2e4 e7e5 g1f3", "e2e4 e7e5 f1c4 g8f6")
+    board = update_board(setup_board(make_game("d2d4")), make_game("e2e4"))
+    assert board.move_stack == [chess.Move.from_uci("e2e4")]